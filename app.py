@@ -1,9 +1,11 @@
 import streamlit as st
-import pdfplumber
-import pandas as pd
 import os
-import tempfile
-from pdf_extractor import HighPrecisionPDFExtractor
+import threading
+import time
+from pdf_extractor import EXTRACTOR_VERSION, FIELD_STATUSES, default_summary, incomplete_fields, summary_row
+from extraction_jobs import QUEUED, ExtractionJobManager, QueueFullError
+from result_cache import ResultCache
+from revision_store import RevisionStore
 
 # Configuración de página con estética "Premium"
 st.set_page_config(
@@ -13,85 +15,483 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Estilo CSS personalizado para el efecto "WOW" y optimización móvil
-st.markdown("""
-    <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;700&display=swap');
-    
-    .stApp {
-        background: linear-gradient(135deg, #eef2f3 0%, #8e9eab 100%);
-        font-family: 'Inter', sans-serif;
-    }
-    .metric-card {
-        background-color: white;
-        padding: 15px;
-        border-radius: 12px;
-        box-shadow: 0 4px 15px rgba(0,0,0,0.1);
-        text-align: center;
-        border-left: 5px solid #007bff;
-        margin-bottom: 10px;
-    }
-    .crew-badge {
-        display: inline-block;
-        padding: 6px 14px;
-        margin: 4px;
-        background-color: #007bff;
-        color: white;
-        border-radius: 20px;
-        font-size: 0.85em;
-        font-weight: 600;
-        box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-    }
-    .mel-item {
-        background-color: #f8f9fa;
-        padding: 10px;
-        border-radius: 8px;
-        margin-bottom: 8px;
-        border-left: 4px solid #6c757d;
-    }
-    .met-badge {
-        display: inline-block;
-        padding: 5px 12px;
-        border-radius: 15px;
-        margin: 3px;
-        font-weight: 700;
-        color: white;
-    }
-    .low-vis {
-        background-color: #dc3545;
-        animation: pulse 2s infinite;
-    }
-    .normal-vis {
-        background-color: #28a745;
-    }
-    .notam-item {
-        background-color: #fff3cd;
-        padding: 12px;
-        border-radius: 8px;
-        margin-bottom: 10px;
-        border-left: 5px solid #ffc107;
-        color: #856404;
-        font-size: 0.9em;
-        box-shadow: 0 2px 5px rgba(0,0,0,0.05);
-    }
-    @keyframes pulse {
-        0% { opacity: 1; }
-        50% { opacity: 0.7; }
-        100% { opacity: 1; }
-    }
-    /* Optimización para móviles */
-    @media (max-width: 640px) {
-        .metric-card h2 {
-            font-size: 1.2rem !important;
-        }
-        .stTabs [data-baseweb="tab"] {
-            padding-left: 10px;
-            padding-right: 10px;
-            font-size: 0.8rem;
-        }
-    }
-    </style>
-""", unsafe_allow_html=True)
+# Estilo CSS personalizado para el efecto "WOW" y optimización móvil.
+# Se sirve como archivo estático (static/style.css, ver .streamlit/config.toml): el navegador
+# lo guarda en caché en vez de recibir toda la hoja de estilos en cada ejecución del script.
+st.markdown('<link rel="stylesheet" href="app/static/style.css">', unsafe_allow_html=True)
+
+@st.cache_resource
+def get_result_cache():
+    # Shared by every session: the same release uploaded by both pilots is parsed once
+    return ResultCache(
+        cache_dir=os.environ.get("BRIEFING_CACHE_DIR"),
+        ttl=float(os.environ.get("BRIEFING_CACHE_TTL", 24 * 3600)),
+    )
+
+@st.cache_resource
+def get_revision_store():
+    # Páginas ya extraídas de liberaciones recientes: una re-liberación solo procesa lo que cambió
+    return RevisionStore()
+
+@st.cache_resource
+def preload_engines():
+    # Carga PyMuPDF, pdfplumber y pandas en segundo plano una sola vez por proceso, después de
+    # la primera pantalla: la primera extracción no paga esas importaciones y el inicio no espera
+    def load():
+        import pymupdf
+        import pdfplumber
+        import navlog
+    thread = threading.Thread(target=load, name="preload", daemon=True)
+    thread.start()
+    return thread
+
+@st.cache_resource
+def get_job_manager():
+    # Pool de extracción compartido; BRIEFING_MAX_JOBS limita las extracciones simultáneas
+    return ExtractionJobManager.from_env()
+
+# Intervalo de consulta del estado de una extracción en curso
+POLL_SECONDS = 0.5
+
+# Tarjeta de la interfaz que se actualiza cuando llega cada campo del extractor
+FIELD_SLOTS = {
+    "vuelo": "flight",
+    "matricula": "flight",
+    "tiempo_vuelo": "flight",
+    "turbulencia_max": "conditions",
+    "turbulencia_loc": "conditions",
+    "turbulencias_severas": "conditions",
+    "turbulencias_repetidas": "conditions",
+    "viento_arribo": "conditions",
+    "pista_uso": "conditions",
+    "limitacion_peso": "weights",
+    "limitacion_valor": "weights",
+    "limitacion_margen": "weights",
+    "limitacion_critica": "weights",
+    "mel_items": "mel",
+    "meteorologia": "met",
+    "alternos": "met",
+    "tripulacion": "crew",
+    "notams_criticos": "notams",
+}
+
+SLOT_LABELS = {
+    "flight": "Datos del vuelo",
+    "conditions": "Turbulencia, viento y pista",
+    "weights": "Limitaciones de peso",
+    "mel": "MEL Items",
+    "met": "Meteorología",
+    "crew": "Tripulación",
+    "notams": "NOTAMs",
+}
+
+# Estados de summary["estado_campos"] que no son "ok"
+STATUS_LABELS = {
+    "partial": "incompleta",
+    "timeout": "tiempo agotado",
+    "error": "error al procesar",
+}
+
+def incomplete_slots(summary):
+    # Tarjeta -> estado más grave entre sus campos que no quedaron completos
+    slots = {}
+    for field, status in incomplete_fields(summary).items():
+        name = FIELD_SLOTS.get(field)
+        if name and FIELD_STATUSES.index(status) > FIELD_STATUSES.index(slots.get(name, "ok")):
+            slots[name] = status
+    return slots
+
+def render_flight(summary):
+    # Fila 1: Datos Principales
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.markdown(f'<div class="metric-card"><p style="color: #666; font-size: 0.8em; margin: 0;">VUELO</p><h2 style="margin: 0; color: #007bff;">{summary["vuelo"]}</h2></div>', unsafe_allow_html=True)
+    with col2:
+        st.markdown(f'<div class="metric-card"><p style="color: #666; font-size: 0.8em; margin: 0;">MATRÍCULA</p><h2 style="margin: 0; color: #007bff;">{summary["matricula"]}</h2></div>', unsafe_allow_html=True)
+    with col3:
+        st.markdown(f'<div class="metric-card"><p style="color: #666; font-size: 0.8em; margin: 0;">DURACIÓN</p><h2 style="margin: 0; color: #007bff;">{summary["tiempo_vuelo"]}</h2></div>', unsafe_allow_html=True)
+
+def render_conditions(summary):
+    # Fila 2: Meteorología y Operación
+    st.markdown("<br>", unsafe_allow_html=True)
+    col4, col5, col6, col7 = st.columns(4)
+
+    # Extraer datos de turbulencia de forma segura
+    t_max = summary.get("turbulencia_max", "N/A")
+    t_loc = summary.get("turbulencia_loc", "No detectada")
+    t_sev = summary.get("turbulencias_severas", [])
+    t_rep = summary.get("turbulencias_repetidas", {})
+
+    # Card 1: Turbulencia Máxima (Fondo Blanco, Borde Amarillo)
+    max_turb_html = f'<div class="metric-card" style="border-left-color: #ffc107; text-align: left; min-height: 120px;">'
+    max_turb_html += f'<p style="color: #666; font-size: 0.85em; margin: 0; font-weight: 700;">TURBULENCIA MÁXIMA</p>'
+    max_turb_html += f'<h2 style="margin: 5px 0; color: #ffc107; font-size: 2.2em; font-weight: 800;">{t_max}</h2>'
+    max_turb_html += f'<p style="margin: 0; font-size: 1.0em; color: #666; font-weight: 600;">{t_loc}</p>'
+    max_turb_html += '</div>'
+
+    # Card 2: Otras Turbulencias (Fondo Blanco, Borde Naranja)
+    extra_html = f'<div class="metric-card" style="border-left-color: #fd7e14; text-align: left; min-height: 120px;">'
+    extra_html += '<p style="color: #666; font-size: 0.85em; margin: 0; font-weight: 700;">OTRAS TURBULENCIAS</p>'
+
+    extra_points = []
+    # Limpiar comparación: extraer nombre y asegurar grado como entero
+    max_wp_name = t_loc.split(" (")[0] if " (" in t_loc else t_loc
+    try:
+        max_grade_int = int(t_max)
+    except ValueError: # Catch specific error for int conversion
+        max_grade_int = -1 # Default to a value that won't match
+
+    seen = {f"{max_wp_name}_{max_grade_int}"}
+
+    for t in t_sev:
+        key = f"{t['punto']}_{t['grado']}"
+        if key not in seen:
+            extra_points.append(t)
+            seen.add(key)
+
+    for deg, pts in t_rep.items():
+        for p in pts:
+            key = f"{p['punto']}_{p['grado']}"
+            if key not in seen:
+                extra_points.append(p)
+                seen.add(key)
+
+    if extra_points:
+        for p in extra_points:
+            extra_html += f'<div style="margin-top: 8px; border-top: 1px solid #eee; padding-top: 5px;">'
+            extra_html += f'<h2 style="margin: 0; display: inline; color: #fd7e14; font-size: 1.6em; font-weight: 800;">{p["grado"]:02}</h2>'
+            extra_html += f'<span style="font-size: 1.0em; color: #666; margin-left: 5px; font-weight: 600;">{p["punto"]} ({p["eet"]})</span>'
+            extra_html += '</div>'
+    else:
+        extra_html += '<p style="margin: 15px 0; font-size: 0.9em; color: #28a745; font-weight: 600;">No se detectaron más variaciones.</p>'
+
+    extra_html += '</div>'
+
+    with col4:
+        st.markdown(max_turb_html, unsafe_allow_html=True)
+    with col5:
+        st.markdown(extra_html, unsafe_allow_html=True)
+    with col6:
+        st.markdown(f'<div class="metric-card" style="border-left-color: #28a745;"><p style="color: #666; font-size: 0.8em; margin: 0;">VIENTO ARR</p><h2 style="margin: 0; color: #28a745;">{summary["viento_arribo"]}</h2></div>', unsafe_allow_html=True)
+    with col7:
+        st.markdown(f'<div class="metric-card" style="border-left-color: #17a2b8;"><p style="color: #666; font-size: 0.8em; margin: 0;">PISTA USO</p><h2 style="margin: 0; color: #17a2b8;">{summary["pista_uso"]}</h2></div>', unsafe_allow_html=True)
+
+def render_weights(summary):
+    # Fila 3: Limitaciones de Peso
+    st.markdown("<br>", unsafe_allow_html=True)
+    limit_color = "#dc3545" if summary["limitacion_critica"] else "#6c757d"
+    st.markdown(f"""
+        <div class="metric-card" style="border-left: 5px solid {limit_color}; text-align: left; padding-left: 20px;">
+            <p style="color: #666; font-size: 0.8em; margin: 0;">LIMITACIÓN MÁS RESTRICTIVA</p>
+            <h3 style="margin: 5px 0; color: {limit_color};">{summary["limitacion_peso"]} ({summary["limitacion_valor"]})</h3>
+            <p style="margin: 0; font-weight: 700; color: {limit_color};">MARGEN: {summary["limitacion_margen"]} kg</p>
+        </div>
+    """, unsafe_allow_html=True)
+
+def render_mel(summary):
+    st.subheader("🛠️ MEL Items")
+    if summary.get("mel_items"):
+        for item in summary["mel_items"]:
+            st.markdown(f"""
+                <div class="mel-item">
+                    <b style="color: #007bff;">{item['number']} (Level {item['level']})</b><br>
+                    <span style="font-size: 0.9em; color: #444;"><b>Defecto:</b> {item.get('defect', 'N/A')}</span><br>
+                    <span style="font-size: 0.85em; color: #666;"><b>Resumen:</b> {item.get('description', 'N/A')}</span>
+                </div>
+            """, unsafe_allow_html=True)
+    else:
+        st.info("No se detectaron MEL items diferidos.")
+
+def render_met(summary):
+    st.subheader("🌡️ Meteorología (Visibilidad)")
+    if summary.get("meteorologia"):
+        met_html = ""
+        for met in summary["meteorologia"]:
+            cls = "low-vis" if met['low_vis'] else "normal-vis"
+            vis_str = "CAVOK" if met['visibility'] >= 9999 else f"{met['visibility']}m"
+            met_html += f'<div class="met-badge {cls}">{met["airport"]}: {vis_str}</div>'
+        st.markdown(f'<div style="background: white; padding: 15px; border-radius: 12px; box-shadow: 0 4px 10px rgba(0,0,0,0.05);">{met_html}</div>', unsafe_allow_html=True)
+    else:
+        st.info("No se detectó información detallada de visibilidad en METARs.")
+    if summary.get("alternos"):
+        st.caption("Alternativas: " + " · ".join(format_alternate(alt) for alt in summary["alternos"]))
+
+def format_alternate(alt):
+    # "YSCB 240/10 CAVOK"; visibilidad del METAR o, si no hay, del TAF
+    parts = [alt["airport"], alt["wind"] or "viento N/D"]
+    if alt["visibility"] is not None:
+        parts.append("CAVOK" if alt["visibility"] >= 9999 else f"{alt['visibility']}m")
+    return " ".join(parts)
+
+def render_crew(summary):
+    st.subheader("👥 Tripulación Detectada")
+    crew_html = "".join([f'<span class="crew-badge">{person}</span>' for person in summary['tripulacion']])
+    st.markdown(f'<div style="background: white; padding: 15px; border-radius: 12px; box-shadow: 0 4px 10px rgba(0,0,0,0.05);">{crew_html}</div>', unsafe_allow_html=True)
+
+def render_copy_area(summary, key=None):
+    # ÁREA DE COPIADO RÁPIDO
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    # Preparar texto de turbulencias adicionales
+    extra_turb = ""
+    if summary.get("turbulencias_severas"):
+        extra_turb += "- ⚠️ SEVERAS (>05): " + ", ".join([f"{t['punto']} ({t['eet']})" for t in summary["turbulencias_severas"]]) + "\n"
+    if summary.get("turbulencias_repetidas"):
+        for deg, pts in summary["turbulencias_repetidas"].items():
+            extra_turb += f"- 🔄 REPETIDAS ({int(deg):02}): " + ", ".join([f"{t['punto']} ({t['eet']})" for t in pts]) + "\n"
+
+    # Preparar texto de MEL
+    mel_text = ""
+    if summary.get("mel_items"):
+        mel_text = "🛠️ MEL ITEMS:\n" + "\n".join([f"- {m['number']} ({m['level']}): {m['defect']} | {m['description']}" for m in summary['mel_items']]) + "\n\n"
+
+    # Preparar texto de NOTAMs
+    notam_text = ""
+    if summary.get("notams_criticos"):
+        notam_text = "⚠️ NOTAMs CRÍTICOS:\n" + "\n".join([f"- {n}" for n in summary['notams_criticos']]) + "\n\n"
+
+    # Preparar texto de Meteorología
+    met_text = ""
+    if summary.get("meteorologia"):
+        met_text = "🌡️ VISIBILIDAD:\n" + ", ".join([f"{m['airport']}: {m['visibility']}m" for m in summary['meteorologia']]) + "\n\n"
+
+    # Preparar texto de alternativas
+    alt_text = "".join([f"- Alternativa: {format_alternate(alt)}\n" for alt in summary.get("alternos", [])])
+
+    summary_text = (
+        f"✈️ RESUMEN DE VUELO\n--------------------\n"
+        f"Vuelo: {summary['vuelo']}\n"
+        f"Matrícula: {summary['matricula']}\n"
+        f"Tiempo: {summary['tiempo_vuelo']}\n\n"
+        f"{mel_text}"
+        f"{notam_text}"
+        f"{met_text}"
+        f"⚖️ LIMITACIONES DE PESO:\n"
+        f"- Limitación: {summary['limitacion_peso']} ({summary['limitacion_valor']})\n"
+        f"- Margen: {summary['limitacion_margen']} kg {'(CRÍTICA)' if summary['limitacion_critica'] else ''}\n\n"
+        f"🌦️ METEOROLOGÍA:\n"
+        f"- Turbulencia Máxima: {summary['turbulencia_max']} en {summary['turbulencia_loc']}\n"
+        f"{extra_turb}"
+        f"- Viento Arribo: {summary['viento_arribo']}\n\n"
+        f"🛫 OPERACIÓN:\n"
+        f"- Pista en Uso: {summary['pista_uso']}\n"
+        f"{alt_text}\n"
+        f"👥 TRIPULACIÓN:\n" + "\n".join([f"- {p}" for p in summary['tripulacion']])
+    )
+    st.text_area("📋 Resumen para copiar:", value=summary_text, height=400, key=key)
+
+def render_notams(summary):
+    # --- SECCIÓN FINAL DE NOTAMS ---
+    st.markdown("---")
+    st.subheader("⚠️ NOTAMs Críticos (Restricciones Operacionales)")
+    if summary.get("notams_criticos"):
+        for notam in summary["notams_criticos"]:
+            st.markdown(f'<div class="notam-item">{notam}</div>', unsafe_allow_html=True)
+    else:
+        st.success("No se detectaron restricciones críticas en los NOTAMs (Cierres de pista, ILS U/S, etc.)")
+
+def render_changes(changes):
+    # Diferencias con la liberación anterior del mismo vuelo
+    st.subheader("🔄 Cambios respecto a la liberación anterior")
+    lines = [f"Páginas modificadas: {', '.join(map(str, changes['paginas_modificadas'])) or 'ninguna'}"]
+    if "limitacion" in changes:
+        antes, ahora = changes["limitacion"]["antes"], changes["limitacion"]["ahora"]
+        lines.append(
+            f"Peso: {antes['limitacion_peso']} margen {antes['limitacion_margen']} kg → "
+            f"{ahora['limitacion_peso']} margen {ahora['limitacion_margen']} kg"
+        )
+    lines += [f"NOTAM nuevo: {notam}" for notam in changes["notams_nuevos"]]
+    lines += [f"NOTAM retirado: {notam}" for notam in changes["notams_retirados"]]
+    lines += [f"MEL agregado: {item['number']} {item['defect']}" for item in changes["mel_agregados"]]
+    lines += [f"MEL cerrado: {item['number']} {item['defect']}" for item in changes["mel_retirados"]]
+    if len(lines) == 1 and not changes["campos_modificados"]:
+        lines.append("Sin cambios en el resumen.")
+    st.info("\n\n".join(lines))
+
+def render_metrics(metrics):
+    # Panel de rendimiento: tiempos por etapa del extractor
+    with st.expander("⏱️ Rendimiento", expanded=False):
+        st.caption(
+            f"Motor: {metrics['engine']} · {metrics['pages']} páginas · "
+            f"{metrics['pdf_bytes'] / 1024:.0f} KB · total {metrics['total_seconds'] * 1000:.0f} ms"
+            + (f" · memoria pico {metrics['peak_rss'] / 2**20:.0f} MB" if metrics.get('peak_rss') else "")
+        )
+        rows = [
+            {
+                "Etapa": name,
+                "ms": round(entry["seconds"] * 1000, 1),
+                "Llamadas": entry["calls"],
+                "Páginas": entry["pages"],
+                "Caracteres": entry["chars"],
+            }
+            for name, entry in metrics["stages"].items()
+        ]
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+
+SLOT_RENDERERS = {
+    "flight": render_flight,
+    "conditions": render_conditions,
+    "weights": render_weights,
+    "mel": render_mel,
+    "met": render_met,
+    "crew": render_crew,
+    "notams": render_notams,
+}
+
+def create_slots():
+    # Reserva el lugar de cada tarjeta para irlas llenando a medida que llegan los datos
+    slots = {"status": st.empty(), "flight": st.empty(), "conditions": st.empty(), "weights": st.empty()}
+    col_mel, col_met = st.columns(2)
+    with col_mel:
+        slots["mel"] = st.empty()
+    with col_met:
+        slots["met"] = st.empty()
+    slots["crew"] = st.empty()
+    slots["copy"] = st.empty()
+    slots["notams"] = st.empty()
+    for name, label in SLOT_LABELS.items():
+        slots[name].info(f"⏳ {label}...")
+    return slots
+
+def render_slot(slots, name, summary, status=None):
+    with slots[name].container():
+        if status is not None:
+            st.warning(f"⚠️ {SLOT_LABELS[name]}: {STATUS_LABELS[status]}. Los valores de esta sección pueden faltar o estar incompletos.")
+        SLOT_RENDERERS[name](summary)
+
+def render_results(results, summary, progress=None, key=None):
+    # results: iterable de (campo, valor); cada tarjeta se redibuja apenas cambia uno de sus campos.
+    # Con progress la extracción sigue en curso y solo se dibujan las tarjetas ya disponibles.
+    # key distingue los widgets cuando se muestran varios archivos en la misma página.
+    slots = create_slots()
+    if progress is None:
+        slots["status"].info("Procesando con alta precisión...")
+    else:
+        slots["status"].progress(progress, text=f"Procesando con alta precisión... {progress:.0%}")
+    pending = set(SLOT_RENDERERS)
+    for field, value in results:
+        summary[field] = value
+        name = FIELD_SLOTS.get(field)
+        if name:
+            render_slot(slots, name, summary)
+            pending.discard(name)
+    if progress is not None:
+        return
+
+    # Tarjetas sin datos se muestran con sus valores por defecto, y las que
+    # quedaron incompletas se redibujan con su aviso
+    incomplete = incomplete_slots(summary)
+    for name in pending | set(incomplete):
+        render_slot(slots, name, summary, incomplete.get(name))
+    with slots["copy"].container():
+        render_copy_area(summary, key=key)
+    # --- RESULTADOS AUTOMÁTICOS ---
+    if incomplete:
+        sections = ", ".join(f"{SLOT_LABELS[name]} ({STATUS_LABELS[status]})" for name, status in incomplete.items())
+        slots["status"].warning(f"⚠️ Extracción parcial. Secciones incompletas: {sections}")
+    else:
+        slots["status"].success("✅ Extracción Completada")
+
+def start_extractions(files):
+    # Un trabajo en segundo plano por archivo; los que ya están en caché no se vuelven a procesar
+    cache = get_result_cache()
+    entries = []
+    for uploaded in files:
+        pdf_bytes = uploaded.getvalue()
+        cache_key = cache.make_key(pdf_bytes, EXTRACTOR_VERSION)
+        entry = {"name": uploaded.name, "job_id": None, "cached": cache.get(cache_key), "error": None}
+        if entry["cached"] is None:
+            try:
+                entry["job_id"] = get_job_manager().submit(
+                    pdf_bytes, cache=cache, cache_key=cache_key, low_memory=True, revisions=get_revision_store()
+                )
+            except QueueFullError:
+                entry["error"] = "Hay demasiadas extracciones en curso. Intenta nuevamente en unos segundos."
+        entries.append(entry)
+    st.session_state["extracciones"] = entries
+
+def entry_state(entry):
+    # (trabajo, resumen disponible, estado) de un archivo subido
+    if entry["cached"] is not None:
+        return None, entry["cached"], "⚡ Caché"
+    if entry["error"]:
+        return None, None, "⚠️ No iniciado"
+    job = get_job_manager().get(entry["job_id"])
+    if job is None:
+        return None, None, "⚠️ No disponible"
+    if job.active:
+        summary = default_summary()
+        summary.update(job.snapshot())
+        return job, summary, "⏳ En cola" if job.status == QUEUED else f"⏳ {job.progress:.0%}"
+    if job.error is not None:
+        return job, None, "❌ Error"
+    if incomplete_fields(job.summary):
+        return job, job.summary, "⚠️ Parcial"
+    return job, job.summary, "✅ Listo"
+
+def render_entry(entry, key=None, show_metrics=True):
+    # Tarjetas detalladas de un archivo; la extracción puede seguir en curso.
+    # Dentro de un expander no se muestra el panel de rendimiento (otro expander).
+    job, summary, _ = entry_state(entry)
+    if entry["cached"] is not None:
+        render_results(entry["cached"].items(), default_summary(), key=key)
+        st.caption("⚡ Resultado recuperado desde caché.")
+    elif entry["error"]:
+        st.warning(entry["error"])
+    elif job is None:
+        st.warning("La extracción anterior ya no está disponible. Vuelve a extraer el PDF.")
+    elif job.active:
+        if job.status == QUEUED:
+            st.caption("⏳ En cola, esperando un procesador disponible...")
+        render_results(job.snapshot().items(), default_summary(), progress=job.progress, key=key)
+    elif job.error is not None:
+        st.error(f"Error: {job.error}")
+    else:
+        render_results(summary.items(), default_summary(), key=key)
+        if job.changes:
+            render_changes(job.changes)
+        if show_metrics:
+            render_metrics(job.metrics)
+
+def render_comparison(entries):
+    # Una fila por archivo con los datos clave para revisar varias liberaciones a la vez
+    rows = []
+    for entry in entries:
+        _, summary, status = entry_state(entry)
+        row = summary_row(summary) if summary is not None else {}
+        rows.append({
+            "Archivo": entry["name"],
+            "Estado": status,
+            "Vuelo": row.get("vuelo"),
+            "Fecha": row.get("fecha"),
+            "Ruta": f"{row['origen']}-{row['destino']}" if row else None,
+            "Matrícula": row.get("matricula"),
+            "Tiempo de vuelo": row.get("tiempo_vuelo"),
+            "Limitación": row.get("limitacion_peso"),
+            # El margen es "0" (texto) mientras no hay datos de peso
+            "Margen (kg)": str(row.get("limitacion_margen", "")),
+            "Turbulencia máx.": row.get("turbulencia_max"),
+            "NOTAMs críticos": row.get("notams_criticos"),
+            "Baja visibilidad": row.get("baja_visibilidad"),
+        })
+    st.subheader("📋 Comparación de vuelos")
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+
+def render_extractions(entries):
+    # Las extracciones corren en segundo plano: se consulta su estado en cada ejecución
+    # del script y se vuelve a ejecutar hasta que terminan todas
+    if len(entries) == 1:
+        render_entry(entries[0])
+    else:
+        render_comparison(entries)
+        for i, entry in enumerate(entries):
+            _, summary, status = entry_state(entry)
+            flight = summary["vuelo"] if summary is not None else "N/A"
+            with st.expander(f"{status} · {entry['name']} · Vuelo {flight}", expanded=False):
+                render_entry(entry, key=f"copia_{i}", show_metrics=False)
+    if any(job is not None and job.active for job, _, _ in map(entry_state, entries)):
+        time.sleep(POLL_SECONDS)
+        st.rerun()
 
 def main():
     st.sidebar.image("https://img.icons8.com/clouds/200/airplane-take-off.png", width=120)
@@ -100,11 +500,11 @@ def main():
     st.sidebar.info("Para usar en tu celular, conéctalo al mismo Wi-Fi y usa la URL de red que aparece en la terminal.")
 
     st.title("✈️ PDF Flight Extractor Pro")
-    
+
     with st.expander("ℹ️ ¿Qué información extrae esta herramienta?", expanded=False):
         st.markdown("""
         Esta aplicación analiza automáticamente tu **PDF de despacho** para entregarte un resumen operativo crítico de alta precisión:
-        
+
         *   **📊 Resumen Operativo**: Datos de vuelo, matrícula y duración estimada.
         *   **⚖️ Limitaciones de Peso**: Identifica la limitación más restrictiva (MZFW, MTOW o MLDW) basándose en los márgenes calculados.
         *   **🛠️ Mantenimiento (MEL)**: Extrae ítems del reporte de limitaciones operacionales, detallando el defecto y su descripción.
@@ -113,208 +513,30 @@ def main():
         *   **⚠️ NOTAMs Críticos**: Filtra automáticamente cierres de pista, fallas de sistemas (ILS, Luces) y restricciones de aproximación.
         *   **👥 Tripulación**: Identifica a todos los miembros de la tripulación técnica por rol.
         """)
-    
+
     st.markdown("---")
 
-    uploaded_file = st.file_uploader("Sube tu archivo PDF de vuelo", type="pdf")
+    uploaded_files = st.file_uploader(
+        "Sube tus archivos PDF de vuelo (uno o varios)", type="pdf", accept_multiple_files=True
+    )
 
-    if uploaded_file is not None:
+    if uploaded_files:
         # Botón central para extraer información
         st.markdown("<br>", unsafe_allow_html=True)
         if st.button("🚀 EXTRAER TODA LA INFORMACIÓN", use_container_width=True, type="primary"):
-            with st.spinner("Procesando con alta precisión..."):
-                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue())
-                    tmp_path = tmp_file.name
-
-                try:
-                    extractor = HighPrecisionPDFExtractor(tmp_path)
-                    summary = extractor.get_flight_summary()
-                    
-                    # --- RESULTADOS AUTOMÁTICOS ---
-                    st.success("✅ Extracción Completada")
-                    
-                    # Fila 1: Datos Principales
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.markdown(f'<div class="metric-card"><p style="color: #666; font-size: 0.8em; margin: 0;">VUELO</p><h2 style="margin: 0; color: #007bff;">{summary["vuelo"]}</h2></div>', unsafe_allow_html=True)
-                    with col2:
-                        st.markdown(f'<div class="metric-card"><p style="color: #666; font-size: 0.8em; margin: 0;">MATRÍCULA</p><h2 style="margin: 0; color: #007bff;">{summary["matricula"]}</h2></div>', unsafe_allow_html=True)
-                    with col3:
-                        st.markdown(f'<div class="metric-card"><p style="color: #666; font-size: 0.8em; margin: 0;">DURACIÓN</p><h2 style="margin: 0; color: #007bff;">{summary["tiempo_vuelo"]}</h2></div>', unsafe_allow_html=True)
-
-                    # Fila 2: Meteorología y Operación
-                    st.markdown("<br>", unsafe_allow_html=True)
-                    col4, col5, col6, col7 = st.columns(4)
-                    
-                    # Extraer datos de turbulencia de forma segura
-                    t_max = summary.get("turbulencia_max", "N/A")
-                    t_loc = summary.get("turbulencia_loc", "No detectada")
-                    t_sev = summary.get("turbulencias_severas", [])
-                    t_rep = summary.get("turbulencias_repetidas", {})
-                    
-                    # Card 1: Turbulencia Máxima (Fondo Blanco, Borde Amarillo)
-                    max_turb_html = f'<div class="metric-card" style="border-left-color: #ffc107; text-align: left; min-height: 120px;">'
-                    max_turb_html += f'<p style="color: #666; font-size: 0.85em; margin: 0; font-weight: 700;">TURBULENCIA MÁXIMA</p>'
-                    max_turb_html += f'<h2 style="margin: 5px 0; color: #ffc107; font-size: 2.2em; font-weight: 800;">{t_max}</h2>'
-                    max_turb_html += f'<p style="margin: 0; font-size: 1.0em; color: #666; font-weight: 600;">{t_loc}</p>'
-                    max_turb_html += '</div>'
-                    
-                    # Card 2: Otras Turbulencias (Fondo Blanco, Borde Naranja)
-                    extra_html = f'<div class="metric-card" style="border-left-color: #fd7e14; text-align: left; min-height: 120px;">'
-                    extra_html += '<p style="color: #666; font-size: 0.85em; margin: 0; font-weight: 700;">OTRAS TURBULENCIAS</p>'
-                    
-                    extra_points = []
-                    # Limpiar comparación: extraer nombre y asegurar grado como entero
-                    max_wp_name = t_loc.split(" (")[0] if " (" in t_loc else t_loc
-                    try:
-                        max_grade_int = int(t_max)
-                    except ValueError: # Catch specific error for int conversion
-                        max_grade_int = -1 # Default to a value that won't match
-                    
-                    seen = {f"{max_wp_name}_{max_grade_int}"}
-                    
-                    for t in t_sev:
-                        key = f"{t['punto']}_{t['grado']}"
-                        if key not in seen:
-                            extra_points.append(t)
-                            seen.add(key)
-                    
-                    for deg, pts in t_rep.items():
-                        for p in pts:
-                            key = f"{p['punto']}_{p['grado']}"
-                            if key not in seen:
-                                extra_points.append(p)
-                                seen.add(key)
-                    
-                    if extra_points:
-                        for p in extra_points:
-                            extra_html += f'<div style="margin-top: 8px; border-top: 1px solid #eee; padding-top: 5px;">'
-                            extra_html += f'<h2 style="margin: 0; display: inline; color: #fd7e14; font-size: 1.6em; font-weight: 800;">{p["grado"]:02}</h2>'
-                            extra_html += f'<span style="font-size: 1.0em; color: #666; margin-left: 5px; font-weight: 600;">{p["punto"]} ({p["eet"]})</span>'
-                            extra_html += '</div>'
-                    else:
-                        extra_html += '<p style="margin: 15px 0; font-size: 0.9em; color: #28a745; font-weight: 600;">No se detectaron más variaciones.</p>'
-                    
-                    extra_html += '</div>'
-
-                    with col4:
-                        st.markdown(max_turb_html, unsafe_allow_html=True)
-                    with col5:
-                        st.markdown(extra_html, unsafe_allow_html=True)
-                    with col6:
-                        st.markdown(f'<div class="metric-card" style="border-left-color: #28a745;"><p style="color: #666; font-size: 0.8em; margin: 0;">VIENTO ARR</p><h2 style="margin: 0; color: #28a745;">{summary["viento_arribo"]}</h2></div>', unsafe_allow_html=True)
-                    with col7:
-                        st.markdown(f'<div class="metric-card" style="border-left-color: #17a2b8;"><p style="color: #666; font-size: 0.8em; margin: 0;">PISTA USO</p><h2 style="margin: 0; color: #17a2b8;">{summary["pista_uso"]}</h2></div>', unsafe_allow_html=True)
-
-                    # Fila 3: Limitaciones de Peso
-                    st.markdown("<br>", unsafe_allow_html=True)
-                    limit_color = "#dc3545" if summary["limitacion_critica"] else "#6c757d"
-                    st.markdown(f"""
-                        <div class="metric-card" style="border-left: 5px solid {limit_color}; text-align: left; padding-left: 20px;">
-                            <p style="color: #666; font-size: 0.8em; margin: 0;">LIMITACIÓN MÁS RESTRICTIVA</p>
-                            <h3 style="margin: 5px 0; color: {limit_color};">{summary["limitacion_peso"]} ({summary["limitacion_valor"]})</h3>
-                            <p style="margin: 0; font-weight: 700; color: {limit_color};">MARGEN: {summary["limitacion_margen"]} kg</p>
-                        </div>
-                    """, unsafe_allow_html=True)
-
-                    # --- NUEVAS SECCIONES: MEL y MET ---
-                    col_mel, col_met = st.columns(2)
-                    
-                    with col_mel:
-                        st.subheader("🛠️ MEL Items")
-                        if summary.get("mel_items"):
-                            for item in summary["mel_items"]:
-                                st.markdown(f"""
-                                    <div class="mel-item">
-                                        <b style="color: #007bff;">{item['number']} (Level {item['level']})</b><br>
-                                        <span style="font-size: 0.9em; color: #444;"><b>Defecto:</b> {item.get('defect', 'N/A')}</span><br>
-                                        <span style="font-size: 0.85em; color: #666;"><b>Resumen:</b> {item.get('description', 'N/A')}</span>
-                                    </div>
-                                """, unsafe_allow_html=True)
-                        else:
-                            st.info("No se detectaron MEL items diferidos.")
-
-                    with col_met:
-                        st.subheader("🌡️ Meteorología (Visibilidad)")
-                        if summary.get("meteorologia"):
-                            met_html = ""
-                            for met in summary["meteorologia"]:
-                                cls = "low-vis" if met['low_vis'] else "normal-vis"
-                                vis_str = "CAVOK" if met['visibility'] >= 9999 else f"{met['visibility']}m"
-                                met_html += f'<div class="met-badge {cls}">{met["airport"]}: {vis_str}</div>'
-                            st.markdown(f'<div style="background: white; padding: 15px; border-radius: 12px; box-shadow: 0 4px 10px rgba(0,0,0,0.05);">{met_html}</div>', unsafe_allow_html=True)
-                        else:
-                            st.info("No se detectó información detallada de visibilidad en METARs.")
-
-                    st.subheader("👥 Tripulación Detectada")
-                    crew_html = "".join([f'<span class="crew-badge">{person}</span>' for person in summary['tripulacion']])
-                    st.markdown(f'<div style="background: white; padding: 15px; border-radius: 12px; box-shadow: 0 4px 10px rgba(0,0,0,0.05);">{crew_html}</div>', unsafe_allow_html=True)
-
-                    # ÁREA DE COPIADO RÁPIDO
-                    st.markdown("<br>", unsafe_allow_html=True)
-                    
-                    # Preparar texto de turbulencias adicionales
-                    extra_turb = ""
-                    if summary.get("turbulencias_severas"):
-                        extra_turb += "- ⚠️ SEVERAS (>05): " + ", ".join([f"{t['punto']} ({t['eet']})" for t in summary["turbulencias_severas"]]) + "\n"
-                    if summary.get("turbulencias_repetidas"):
-                        for deg, pts in summary["turbulencias_repetidas"].items():
-                            extra_turb += f"- 🔄 REPETIDAS ({int(deg):02}): " + ", ".join([f"{t['punto']} ({t['eet']})" for t in pts]) + "\n"
-
-                    # Preparar texto de MEL
-                    mel_text = ""
-                    if summary.get("mel_items"):
-                        mel_text = "🛠️ MEL ITEMS:\n" + "\n".join([f"- {m['number']} ({m['level']}): {m['defect']} | {m['description']}" for m in summary['mel_items']]) + "\n\n"
-
-                    # Preparar texto de NOTAMs
-                    notam_text = ""
-                    if summary.get("notams_criticos"):
-                        notam_text = "⚠️ NOTAMs CRÍTICOS:\n" + "\n".join([f"- {n}" for n in summary['notams_criticos']]) + "\n\n"
-
-                    # Preparar texto de Meteorología
-                    met_text = ""
-                    if summary.get("meteorologia"):
-                        met_text = "🌡️ VISIBILIDAD:\n" + ", ".join([f"{m['airport']}: {m['visibility']}m" for m in summary['meteorologia']]) + "\n\n"
-
-                    summary_text = (
-                        f"✈️ RESUMEN DE VUELO\n--------------------\n"
-                        f"Vuelo: {summary['vuelo']}\n"
-                        f"Matrícula: {summary['matricula']}\n"
-                        f"Tiempo: {summary['tiempo_vuelo']}\n\n"
-                        f"{mel_text}"
-                        f"{notam_text}"
-                        f"{met_text}"
-                        f"⚖️ LIMITACIONES DE PESO:\n"
-                        f"- Limitación: {summary['limitacion_peso']} ({summary['limitacion_valor']})\n"
-                        f"- Margen: {summary['limitacion_margen']} kg {'(CRÍTICA)' if summary['limitacion_critica'] else ''}\n\n"
-                        f"🌦️ METEOROLOGÍA:\n"
-                        f"- Turbulencia Máxima: {summary['turbulencia_max']} en {summary['turbulencia_loc']}\n"
-                        f"{extra_turb}"
-                        f"- Viento Arribo: {summary['viento_arribo']}\n\n"
-                        f"🛫 OPERACIÓN:\n"
-                        f"- Pista en Uso: {summary['pista_uso']}\n\n"
-                        f"👥 TRIPULACIÓN:\n" + "\n".join([f"- {p}" for p in summary['tripulacion']])
-                    )
-                    st.text_area("📋 Resumen para copiar:", value=summary_text, height=400)
-
-                    # --- SECCIÓN FINAL DE NOTAMS ---
-                    st.markdown("---")
-                    st.subheader("⚠️ NOTAMs Críticos (Restricciones Operacionales)")
-                    if summary.get("notams_criticos"):
-                        for notam in summary["notams_criticos"]:
-                            st.markdown(f'<div class="notam-item">{notam}</div>', unsafe_allow_html=True)
-                    else:
-                        st.success("No se detectaron restricciones críticas en los NOTAMs (Cierres de pista, ILS U/S, etc.)")
-
-                except Exception as e:
-                    st.error(f"Error: {e}")
-                finally:
-                    if os.path.exists(tmp_path):
-                        os.remove(tmp_path)
+            try:
+                start_extractions(uploaded_files)
+            except Exception as e:
+                st.error(f"Error: {e}")
+
+        if st.session_state.get("extracciones"):
+            render_extractions(st.session_state["extracciones"])
     else:
+        st.session_state.pop("extracciones", None)
         st.info("Selecciona un PDF de vuelo para extraer la información.")
         st.image("https://img.icons8.com/clouds/500/pdf.png", width=200)
 
+    preload_engines()
+
 if __name__ == "__main__":
     main()
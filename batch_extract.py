@@ -0,0 +1,207 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from pdf_backends import ENGINES
+from pdf_extractor import (
+    DEFAULT_STAGE_BUDGET, DEFAULT_TOTAL_BUDGET, EXTRACTOR_VERSION, SUMMARY_ROW_FIELDS, HighPrecisionPDFExtractor,
+    options_signature, summary_row,
+)
+from result_cache import ResultCache, content_digest
+from summary_store import SummaryStore
+from text_layer import TextLayerStore
+
+CSV_FIELDS = ['file', 'status', 'error', 'seconds', 'pages'] + list(SUMMARY_ROW_FIELDS)
+
+# One cache per worker process, opened on first use
+_worker_cache = None
+# Results written to the summary store per transaction
+STORE_BATCH = 200
+
+
+def find_pdfs(inputs):
+    # Directories are walked recursively, anything else is treated as a glob
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(os.path.join(root, f) for f in files if f.lower().endswith('.pdf'))
+        else:
+            paths.extend(p for p in glob.glob(item, recursive=True) if os.path.isfile(p))
+    return sorted(set(paths))
+
+
+def extract_file(path, engine='auto', cache_dir=None, stage_budget=DEFAULT_STAGE_BUDGET,
+                 total_budget=DEFAULT_TOTAL_BUDGET, text_layer_dir=None):
+    # Runs in a pool worker; never raises so one bad PDF cannot abort the batch
+    global _worker_cache
+    start = time.perf_counter()
+    # pages: pages actually read (skipped pages and cached results count 0)
+    record = {'file': path, 'status': 'ok', 'error': None, 'pages': 0}
+    try:
+        # Read once; hashing and parsing both work from the same buffer
+        with open(path, 'rb') as f:
+            data = f.read()
+        record['digest'] = content_digest(data)
+        cache = key = None
+        if cache_dir:
+            if _worker_cache is None:
+                _worker_cache = ResultCache(cache_dir=cache_dir)
+            cache = _worker_cache
+            key = cache.make_key(data, EXTRACTOR_VERSION, options_signature({'engine': engine}))
+            cached = cache.get(key)
+            if cached is not None:
+                record['status'] = 'cached'
+                record['summary'] = cached
+                return record
+
+        text_layer = TextLayerStore(text_layer_dir) if text_layer_dir else None
+        extractor = HighPrecisionPDFExtractor(data, engine=engine, page_cache=cache, stage_budget=stage_budget,
+                                              total_budget=total_budget, text_layer=text_layer)
+        record['pages'] = len(extractor.pages)
+        if extractor.error is not None:
+            record['status'] = 'error'
+            record['error'] = str(extractor.error)
+        else:
+            record['summary'] = extractor.get_flight_summary()
+            incomplete = extractor.incomplete_fields()
+            if incomplete:
+                # Kept, but not cached so a later run tries again
+                record['status'] = 'partial'
+                record['error'] = ", ".join(f"{field}: {status}" for field, status in sorted(incomplete.items()))
+            elif cache is not None:
+                cache.put(key, record['summary'])
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        record['seconds'] = round(time.perf_counter() - start, 4)
+    return record
+
+
+class JsonlWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, record):
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+
+class CsvWriter:
+    def __init__(self, out):
+        self.out = out
+        self.writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+        self.writer.writeheader()
+
+    def write(self, record):
+        row = {k: record.get(k) for k in ('file', 'status', 'error', 'seconds', 'pages')}
+        if 'summary' in record:
+            row.update(summary_row(record['summary']))
+        self.writer.writerow(row)
+        self.out.flush()
+
+
+def run_batch(paths, writer, workers=None, max_in_flight=None, engine='auto', cache_dir=None, store=None,
+              stage_budget=DEFAULT_STAGE_BUDGET, total_budget=DEFAULT_TOTAL_BUDGET, text_layer_dir=None):
+    # Keeps at most max_in_flight files queued in the pool and writes each
+    # result as soon as it finishes, so memory stays flat on large batches.
+    # With a SummaryStore, summaries are also inserted STORE_BATCH at a time.
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 2
+    stats = {'files': 0, 'ok': 0, 'cached': 0, 'partial': 0, 'errors': 0, 'pages': 0, 'stored': 0}
+    to_store = []
+    start = time.perf_counter()
+    pending = set()
+    remaining = iter(paths)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            while len(pending) < max_in_flight:
+                path = next(remaining, None)
+                if path is None:
+                    break
+                pending.add(pool.submit(extract_file, path, engine, cache_dir, stage_budget, total_budget,
+                                        text_layer_dir))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record = future.result()
+                writer.write(record)
+                stats['files'] += 1
+                stats['pages'] += record['pages']
+                if record['status'] == 'error':
+                    stats['errors'] += 1
+                    print(f"Error extracting {record['file']}: {record['error']}", file=sys.stderr)
+                else:
+                    if record['status'] == 'partial':
+                        print(f"Incomplete fields in {record['file']}: {record['error']}", file=sys.stderr)
+                    stats[record['status']] += 1
+                    if store is not None:
+                        to_store.append((record['summary'], record['file'], record['digest']))
+            if len(to_store) >= STORE_BATCH or (to_store and not pending):
+                stats['stored'] += len(store.add_many(to_store))
+                to_store = []
+
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract flight summaries from a batch of dispatch PDFs.")
+    parser.add_argument('inputs', nargs='+', help="PDF files, directories or glob patterns")
+    parser.add_argument('-o', '--output', help="output file (default: stdout)")
+    parser.add_argument('-f', '--format', choices=('jsonl', 'csv'), default='jsonl')
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                        help="files queued in the pool at once (default: 2 x workers)")
+    parser.add_argument('--engine', choices=ENGINES, default='auto')
+    parser.add_argument('--cache-dir', default=None, help="reuse results from this result-cache directory")
+    parser.add_argument('--store', default=None,
+                        help="also keep every summary in this SQLite file (see summary_store.py)")
+    parser.add_argument('--text-layer', default=None,
+                        help="keep each PDF's page texts in this directory and reuse them on later runs "
+                             "(see text_layer.py)")
+    parser.add_argument('--stage-budget', type=float, default=DEFAULT_STAGE_BUDGET,
+                        help="seconds each parsing stage may take (default: %(default)s)")
+    parser.add_argument('--total-budget', type=float, default=DEFAULT_TOTAL_BUDGET,
+                        help="seconds one file may take in all (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    paths = find_pdfs(args.inputs)
+    if not paths:
+        print("No PDF files found.", file=sys.stderr)
+        return 2
+
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    store = SummaryStore(args.store) if args.store else None
+    try:
+        writer = CsvWriter(out) if args.format == 'csv' else JsonlWriter(out)
+        stats = run_batch(paths, writer, args.workers, args.max_in_flight, args.engine, args.cache_dir, store,
+                          args.stage_budget, args.total_budget, args.text_layer)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if store is not None:
+            store.close()
+
+    elapsed = stats['seconds'] or 1e-9
+    print(
+        f"{stats['files']} files ({stats['ok']} ok, {stats['cached']} cached, {stats['partial']} partial, "
+        f"{stats['errors']} errors), "
+        f"{stats['pages']} pages read in {elapsed:.2f}s: "
+        f"{stats['files'] / elapsed:.2f} files/s, {stats['pages'] / elapsed:.1f} pages read/s"
+        + (f", {stats['stored']} stored in {args.store}" if store is not None else ""),
+        file=sys.stderr,
+    )
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pymupdf
+import pdfplumber
+
+from pdf_backends import ENGINES
+from pdf_extractor import EXTRACTOR_VERSION, HighPrecisionPDFExtractor, peak_rss
+from synthetic_release import generate_release
+
+DEFAULT_SIZES = (10, 100, 500)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Each snippet runs in a fresh interpreter and prints its own elapsed seconds
+STARTUP_SNIPPETS = {
+    'import_extractor': (
+        "import time; start = time.perf_counter()\n"
+        "import pdf_extractor\n"
+        "print(time.perf_counter() - start)"
+    ),
+    # Script import plus first render of the app, as a new session sees it
+    'app_first_render': (
+        "import time; start = time.perf_counter()\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        "AppTest.from_file('app.py', default_timeout=60).run()\n"
+        "print(time.perf_counter() - start)"
+    ),
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def time_stages(data, engine):
+    # Per-stage timings come from the extractor's own instrumentation
+    start = time.perf_counter()
+    extractor = HighPrecisionPDFExtractor(data, engine=engine)
+    end_to_end = time.perf_counter() - start
+    timings = {name: entry['seconds'] for name, entry in extractor.get_metrics()['stages'].items()}
+    timings['end_to_end'] = end_to_end
+    return timings
+
+
+def _peak_rss_child(path, engine, low_memory):
+    # Runs in a fresh process: ru_maxrss is a lifetime high-water mark
+    baseline = peak_rss()
+    extractor = HighPrecisionPDFExtractor(path, engine=engine, low_memory=low_memory)
+    return baseline, extractor.get_metrics()['peak_rss']
+
+
+def measure_memory(sizes, engines, seed):
+    # Peak RSS in MB per case, default vs low-memory mode, one spawned
+    # process per extraction so earlier runs do not raise the mark
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            path = os.path.join(tmp, f"release_{size}.pdf")
+            with open(path, 'wb') as f:
+                f.write(generate_release(size, seed))
+            for engine in engines:
+                case = results[f"{size}p/{engine}"] = {}
+                for mode, low_memory in (('default', False), ('low_memory', True)):
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                        baseline, peak = pool.submit(_peak_rss_child, path, engine, low_memory).result()
+                    if peak is None:
+                        return None
+                    case[f"rss_{mode}"] = round(peak / 2**20, 1)
+                case['rss_imports'] = round(baseline / 2**20, 1)
+    return results
+
+
+def measure_startup(repeat):
+    # Cold-start cost in ms, median over fresh processes
+    results = {}
+    for name, snippet in STARTUP_SNIPPETS.items():
+        runs = [
+            float(subprocess.run([sys.executable, '-c', snippet], cwd=HERE, capture_output=True,
+                                 text=True, check=True).stdout.strip().splitlines()[-1])
+            for _ in range(repeat)
+        ]
+        results[name] = round(statistics.median(runs) * 1000, 3)
+    return results
+
+
+def run(sizes, engines, repeat, seed):
+    results = {}
+    for size in sizes:
+        data = generate_release(size, seed)
+        for engine in engines:
+            runs = [time_stages(data, engine) for _ in range(repeat)]
+            # Median over repeats; each stage is reported in milliseconds
+            results[f"{size}p/{engine}"] = {
+                stage: round(statistics.median(r.get(stage, 0.0) for r in runs) * 1000, 3)
+                for stage in runs[0]
+            }
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'extractor_version': EXTRACTOR_VERSION,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'pymupdf': pymupdf.VersionBind,
+            'pdfplumber': pdfplumber.__version__,
+            'repeat': repeat,
+            'seed': seed,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def print_report(report, baseline=None):
+    base_results = baseline['results'] if baseline else {}
+    if baseline:
+        print(f"baseline: {baseline['meta'].get('commit')}  current: {report['meta'].get('commit')}")
+    for case, stages in report['results'].items():
+        print(f"\n{case}")
+        for stage, ms in stages.items():
+            unit = "MB" if stage.startswith('rss_') else "ms"
+            line = f"  {stage:<14} {ms:>10.2f} {unit}"
+            old = base_results.get(case, {}).get(stage)
+            if old:
+                line += f"  (was {old:.2f} ms, {(ms - old) / old * 100:+.1f}%)"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the extractor on synthetic dispatch packages.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help="page counts")
+    parser.add_argument('--engines', nargs='+', default=['auto'], choices=ENGINES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', help="write the results as JSON (to compare across commits)")
+    parser.add_argument('--compare', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--memory', action='store_true',
+                        help="also report peak RSS per size, default vs low-memory mode")
+    parser.add_argument('--startup', action='store_true',
+                        help="also report import and first-render time of the app")
+    args = parser.parse_args(argv)
+
+    report = run(args.sizes, args.engines, args.repeat, args.seed)
+    if args.memory:
+        memory = measure_memory(args.sizes, args.engines, args.seed)
+        if memory is None:
+            print("Peak RSS is not available on this platform.", file=sys.stderr)
+        else:
+            for case, values in memory.items():
+                report['results'][case].update(values)
+    if args.startup:
+        report['results']['startup'] = measure_startup(args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from pdf_extractor import HighPrecisionPDFExtractor, default_summary
+from result_cache import content_digest
+from summary_store import SummaryStore
+
+# Concurrent extractions per process; the rest wait in the queue
+DEFAULT_MAX_WORKERS = max(1, min(4, os.cpu_count() or 1))
+# Jobs waiting for a worker before submit() starts refusing new ones
+DEFAULT_MAX_QUEUED = 32
+# Finished jobs kept for sessions to pick up
+DEFAULT_KEEP_FINISHED = 200
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'error'
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class ExtractionJob:
+    def __init__(self, job_id, data, options, cache=None, cache_key=None):
+        self.id = job_id
+        self.status = QUEUED
+        self.data = data
+        self.options = options
+        # Successful results are stored here so other sessions get them instantly
+        self.cache = cache
+        self.cache_key = cache_key
+        # Summary as it fills in; fields_done drives the progress bar
+        self.summary = default_summary()
+        self.fields_done = set()
+        self.metrics = None
+        # Summary diff against an earlier revision of the same release, if any
+        self.changes = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+
+    @property
+    def progress(self):
+        return len(self.fields_done) / len(self.summary)
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def snapshot(self):
+        # Fields found so far, copied so the session can render them while
+        # the worker keeps writing
+        return {field: self.summary[field] for field in list(self.fields_done)}
+
+
+class ExtractionJobManager:
+    # Background extraction for the Streamlit app: sessions submit a PDF,
+    # keep the job id in st.session_state and poll until the job finishes.
+    # A rerun only re-reads the job, it never restarts the extraction.
+    # Jobs run in threads so results can stream into the session; PyMuPDF
+    # is not thread-safe, so its calls are serialised (pdf_backends.PYMUPDF_LOCK)
+    # and concurrent jobs overlap only in pdfplumber and the parsers.
+    def __init__(self, max_workers=None, max_queued=DEFAULT_MAX_QUEUED, keep_finished=DEFAULT_KEEP_FINISHED,
+                 store=None):
+        self.max_workers = max_workers or DEFAULT_MAX_WORKERS
+        self.max_queued = max_queued
+        self.keep_finished = keep_finished
+        # Optional SummaryStore that keeps every successful summary
+        self.store = store
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='extract')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        # BRIEFING_MAX_JOBS: concurrent extractions, BRIEFING_MAX_QUEUED: waiting jobs,
+        # BRIEFING_STORE: SQLite file that keeps the history of summaries
+        store_path = os.environ.get('BRIEFING_STORE')
+        return cls(
+            max_workers=int(os.environ.get('BRIEFING_MAX_JOBS', DEFAULT_MAX_WORKERS)),
+            max_queued=int(os.environ.get('BRIEFING_MAX_QUEUED', DEFAULT_MAX_QUEUED)),
+            store=SummaryStore(store_path) if store_path else None,
+        )
+
+    def submit(self, data, cache=None, cache_key=None, **options):
+        with self._lock:
+            queued = sum(1 for job in self._jobs.values() if job.status == QUEUED)
+            if queued >= self.max_queued:
+                raise QueueFullError(f"{queued} extraction jobs already waiting")
+            job = ExtractionJob(uuid.uuid4().hex, data, options, cache, cache_key)
+            self._jobs[job.id] = job
+            self._prune()
+        self._pool.submit(self._run, job)
+        return job.id
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def shutdown(self, wait=True):
+        self._pool.shutdown(wait=wait)
+        if self.store is not None:
+            self.store.close()
+
+    def _run(self, job):
+        job.status = RUNNING
+        job.started = time.time()
+        try:
+            extractor = HighPrecisionPDFExtractor(job.data, lazy=True, **job.options)
+            for field, value in extractor.iter_results():
+                job.summary[field] = value
+                job.fields_done.add(field)
+            job.metrics = extractor.get_metrics()
+            job.changes = extractor.changes
+            if extractor.error is not None:
+                job.error = extractor.error
+            else:
+                # Degraded results are shown but not cached
+                if job.cache is not None and not extractor.incomplete_fields():
+                    job.cache.put(job.cache_key, extractor.get_flight_summary())
+                if self.store is not None:
+                    self.store.add(extractor.get_flight_summary(), digest=content_digest(job.data))
+        except Exception as e:
+            job.error = e
+        finally:
+            # The PDF is no longer needed once parsed
+            job.data = None
+            job.finished = time.time()
+            job.status = FAILED if job.error is not None else DONE
+
+    def _prune(self):
+        # Oldest finished jobs go first; queued and running jobs are never dropped
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,378 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from pdf_backends import ENGINES
+from pdf_extractor import EXTRACTOR_VERSION, HighPrecisionPDFExtractor, incomplete_fields, options_signature
+from result_cache import ResultCache
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+# Requests waiting for a worker before the service answers 429
+DEFAULT_MAX_QUEUED = 16
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+# Seconds a request waits for its extraction before getting 504
+DEFAULT_TIMEOUT = 120.0
+# Latency percentiles are over the last LATENCY_WINDOW requests,
+# throughput over the last THROUGHPUT_WINDOW seconds
+LATENCY_WINDOW = 1000
+THROUGHPUT_WINDOW = 60.0
+
+
+def _warm_worker():
+    # Pool initializer: pay for the heavy imports (PyMuPDF, pdfplumber,
+    # pandas) when the worker starts instead of on its first request
+    import pymupdf
+    import pdfplumber
+    import navlog
+
+
+def _worker_pid():
+    return os.getpid()
+
+
+def extract_pdf(data, engine='auto'):
+    # Runs in a pool worker; returns (summary, pages, error message)
+    extractor = HighPrecisionPDFExtractor(data, engine=engine, low_memory=True)
+    if extractor.error is not None:
+        return None, len(extractor.pages), str(extractor.error)
+    return extractor.get_flight_summary(), len(extractor.pages), None
+
+
+def percentile(sorted_values, q):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class ServiceMetrics:
+    def __init__(self):
+        self.started = time.time()
+        self.statuses = Counter()
+        self.cache_hits = 0
+        self.pages = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)  # (finished at, seconds)
+        self._lock = threading.Lock()
+
+    def record(self, status, seconds, pages=0, cached=False):
+        with self._lock:
+            self.statuses[status] += 1
+            self.pages += pages
+            self.cache_hits += cached
+            if status == 200:
+                self._latencies.append((time.time(), seconds))
+
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            latencies = sorted(seconds for _, seconds in self._latencies)
+            recent = sum(1 for finished, _ in self._latencies if now - finished <= THROUGHPUT_WINDOW)
+            statuses = dict(self.statuses)
+            cache_hits, pages = self.cache_hits, self.pages
+        window = min(THROUGHPUT_WINDOW, now - self.started) or 1e-9
+        return {
+            'uptime_seconds': round(now - self.started, 1),
+            'requests': sum(statuses.values()),
+            'responses': {str(status): count for status, count in sorted(statuses.items())},
+            'cache_hits': cache_hits,
+            'pages': pages,
+            'latency_ms': {
+                name: round(percentile(latencies, q) * 1000, 1) if latencies else None
+                for name, q in (('p50', 50), ('p95', 95), ('p99', 99))
+            },
+            'throughput_rps': round(recent / window, 3),
+        }
+
+
+class ExtractionService:
+    # Process pool behind the HTTP server. At most workers + max_queued
+    # extractions are accepted at once; a slot is only freed when the
+    # extraction itself finishes, so timed-out requests still count.
+    # Concurrent requests for the same PDF and engine share one extraction.
+    def __init__(self, workers=DEFAULT_WORKERS, max_queued=DEFAULT_MAX_QUEUED, max_bytes=DEFAULT_MAX_BYTES,
+                 timeout=DEFAULT_TIMEOUT, engine='auto', cache=None):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.engine = engine
+        self.cache = cache
+        self.metrics = ServiceMetrics()
+        self._in_flight = 0
+        self._pending = {}  # cache key -> future of the extraction in progress
+        self._lock = threading.Lock()
+        self._pool = self._start_pool()
+
+    def _start_pool(self):
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        # Start every worker now, so the first requests do not wait for it
+        for future in [pool.submit(_worker_pid) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def in_flight(self):
+        with self._lock:
+            return self._in_flight
+
+    def health(self):
+        in_flight = self.in_flight()
+        return {
+            'status': 'ok',
+            'extractor_version': EXTRACTOR_VERSION,
+            'workers': self.workers,
+            'in_flight': in_flight,
+            # Extractions beyond the worker count are waiting in the pool
+            'queue_depth': max(0, in_flight - self.workers),
+            'max_queued': self.max_queued,
+        }
+
+    def stats(self):
+        return dict(self.health(), **self.metrics.snapshot())
+
+    def submit(self, data, engine, key):
+        # Future for the extraction, or None when the queue is full
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            if self._in_flight >= self.workers + self.max_queued:
+                return None
+            self._in_flight += 1
+            try:
+                future = self._pool.submit(extract_pdf, data, engine)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory): replace the pool once
+                self._pool = self._start_pool()
+                future = self._pool.submit(extract_pdf, data, engine)
+            self._pending[key] = future
+        future.add_done_callback(lambda done: self._release(key))
+        return future
+
+    def _release(self, key):
+        with self._lock:
+            self._in_flight -= 1
+            self._pending.pop(key, None)
+
+    def extract(self, data, engine=None):
+        # (HTTP status, response body)
+        engine = engine or self.engine
+        start = time.perf_counter()
+        key = ResultCache.make_key(data, EXTRACTOR_VERSION, options_signature({'engine': engine}))
+        if self.cache is not None:
+            summary = self.cache.get(key)
+            if summary is not None:
+                seconds = time.perf_counter() - start
+                self.metrics.record(200, seconds, cached=True)
+                return 200, {'summary': summary, 'cached': True, 'pages': None, 'seconds': round(seconds, 4)}
+
+        future = self.submit(data, engine, key)
+        if future is None:
+            self.metrics.record(429, 0.0)
+            return 429, {'error': "Extraction queue is full, retry later"}
+        try:
+            summary, pages, error = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            self.metrics.record(504, time.perf_counter() - start)
+            return 504, {'error': f"Extraction did not finish within {self.timeout:g}s"}
+        except Exception as e:
+            self.metrics.record(500, time.perf_counter() - start)
+            return 500, {'error': f"{type(e).__name__}: {e}"}
+        seconds = time.perf_counter() - start
+        if error is not None:
+            self.metrics.record(422, seconds, pages)
+            return 422, {'error': error}
+        if self.cache is not None and not incomplete_fields(summary):
+            self.cache.put(key, summary)
+        self.metrics.record(200, seconds, pages)
+        return 200, {'summary': summary, 'cached': False, 'pages': pages, 'seconds': round(seconds, 4)}
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+
+class ExtractionRequestHandler(BaseHTTPRequestHandler):
+    # POST /extract[?engine=...] with the PDF as the request body;
+    # GET /health and GET /metrics return JSON
+    server_version = 'BriefingExtractor/' + EXTRACTOR_VERSION
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/health':
+            self._send_json(200, self.server.service.health())
+        elif path == '/metrics':
+            self._send_json(200, self.server.service.stats())
+        else:
+            self._send_json(404, {'error': "Not found"})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/extract':
+            self._send_json(404, {'error': "Not found"})
+            return
+        service = self.server.service
+        engine = parse_qs(url.query).get('engine', [service.engine])[0]
+        if engine not in ENGINES:
+            self._send_json(400, {'error': f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}"})
+            return
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            self._send_json(411, {'error': "Content-Length is required"})
+            return
+        if int(length) > service.max_bytes:
+            # The body is not read, so the connection cannot be reused
+            self.close_connection = True
+            self._send_json(413, {'error': f"PDF larger than {service.max_bytes} bytes"})
+            return
+        data = self.rfile.read(int(length))
+        if not data.startswith(b'%PDF'):
+            self._send_json(400, {'error': "Request body is not a PDF"})
+            return
+        status, body = service.extract(data, engine)
+        headers = {'Retry-After': '1'} if status == 429 else {}
+        self._send_json(status, body, headers)
+
+    def _send_json(self, status, body, headers=None):
+        payload = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+class ExtractionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service, quiet=False):
+        super().__init__(address, ExtractionRequestHandler)
+        self.service = service
+        self.quiet = quiet
+
+
+def serve(args):
+    cache = None
+    if args.cache or args.cache_dir:
+        cache = ResultCache(cache_dir=args.cache_dir)
+    service = ExtractionService(
+        workers=args.workers, max_queued=args.max_queued, max_bytes=int(args.max_mb * 1024 * 1024),
+        timeout=args.timeout, engine=args.engine, cache=cache,
+    )
+    server = ExtractionServer((args.host, args.port), service, quiet=args.quiet)
+    print(f"Serving on http://{args.host}:{server.server_port} with {service.workers} workers "
+          f"(POST /extract, GET /health, GET /metrics)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+
+def _post_pdf(url, data):
+    # (status, seconds) for one request
+    request = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/pdf'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except OSError:
+        status = 0  # connection refused or reset
+    return status, time.perf_counter() - start
+
+
+def load_test(args):
+    from synthetic_release import generate_release
+
+    if args.pdf:
+        with open(args.pdf, 'rb') as f:
+            pdfs = [f.read()]
+    elif args.distinct:
+        # A different release per request, so a server-side cache cannot answer
+        pdfs = [generate_release(args.pages, args.seed + i) for i in range(args.requests)]
+    else:
+        pdfs = [generate_release(args.pages, args.seed)]
+    url = args.url.rstrip('/') + '/extract'
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda i: _post_pdf(url, pdfs[i % len(pdfs)]), range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    statuses = Counter(status for status, _ in results)
+    latencies = sorted(seconds for status, seconds in results if status == 200)
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {elapsed:.2f}s: "
+          f"{args.requests / elapsed:.2f} req/s, {len(latencies) / elapsed:.2f} ok/s")
+    print("status: " + ", ".join(f"{status}={count}" for status, count in sorted(statuses.items())))
+    if latencies:
+        print("latency: " + ", ".join(
+            f"p{q}={percentile(latencies, q) * 1000:.0f} ms" for q in (50, 95, 99)))
+    with urllib.request.urlopen(args.url.rstrip('/') + '/metrics') as response:
+        print("server: " + response.read().decode('utf-8'))
+    return 0 if statuses.get(200) else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP service for flight summary extraction.")
+    commands = parser.add_subparsers(dest='command')
+
+    serve_parser = commands.add_parser('serve', help="run the service (default)")
+    serve_parser.add_argument('--host', default=DEFAULT_HOST)
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('-w', '--workers', type=int, default=DEFAULT_WORKERS, help="worker processes")
+    serve_parser.add_argument('--max-queued', type=int, default=DEFAULT_MAX_QUEUED,
+                              help="requests waiting for a worker before answering 429")
+    serve_parser.add_argument('--max-mb', type=float, default=DEFAULT_MAX_BYTES / 2**20,
+                              help="largest accepted PDF, in MB")
+    serve_parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                              help="seconds before a request gets 504")
+    serve_parser.add_argument('--engine', choices=ENGINES, default='auto', help="default engine")
+    serve_parser.add_argument('--cache', action='store_true', help="reuse results in memory")
+    serve_parser.add_argument('--cache-dir', default=None, help="also keep results in this directory")
+    serve_parser.add_argument('-q', '--quiet', action='store_true', help="no per-request log lines")
+
+    load_parser = commands.add_parser('loadtest', help="send concurrent requests to a running service")
+    load_parser.add_argument('pdf', nargs='?', help="PDF to send (default: a synthetic release)")
+    load_parser.add_argument('--url', default=f"http://{DEFAULT_HOST}:{DEFAULT_PORT}")
+    load_parser.add_argument('-n', '--requests', type=int, default=50)
+    load_parser.add_argument('-c', '--concurrency', type=int, default=8)
+    load_parser.add_argument('--pages', type=int, default=20, help="pages of the synthetic release")
+    load_parser.add_argument('--seed', type=int, default=0)
+    load_parser.add_argument('--distinct', action='store_true',
+                             help="a different synthetic release per request (defeats the cache)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'loadtest':
+        return load_test(args)
+    if args.command is None:
+        args = serve_parser.parse_args([])
+    return serve(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
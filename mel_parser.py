@@ -0,0 +1,104 @@
+import re
+
+# Item header, e.g. "34-11-01 MEL C 12/02/2026 MOC Nº 45123"
+MEL_HEADER = re.compile(r'(\d{2}-\d{2}-\d{2})\s+MEL\s+([A-D])\s*')
+# Page furniture repeated at the top of every deferred-list page
+PAGE_HEADER = re.compile(r'DEFERRED ITEM LIST|Operational Limitations Report')
+
+DATE = re.compile(r'\d{2}/\d{2}/\d{1,4}')
+# PDF noise, one alternation applied in a single pass (after the dates)
+NOISE = re.compile(
+    r'MOC\s*N?º?\s*\d+'
+    r'|PAGE\s+\d+'
+    r'|LATAM\s+OPERATIONAL'
+    r'|MAINTENANCE\s+PROCEDURES'
+    r'|CREW\s+PROCEDURE'
+    r'|--+'
+    r'|BAR\s+CODE'
+    r'|A/C\s+Registration'
+    r'|Defect\s+Found'
+    r'|Moc\s+No'
+    r'|Open\s+Description'
+    r'|Report'
+    r'|Repetetive',
+    re.IGNORECASE,
+)
+# Registrations, e.g. "9 BGE", "97 BGF", "CC-BGE"
+REGISTRATION = re.compile(r'\b\d{1,3}\s+[A-Z]{3}\b|\bCC-[A-Z]{3}\b')
+WHITESPACE = re.compile(r'\s+')
+STATUS_WORD = re.compile(r'\b(INOP|LIMIT|RESTR|FAIL|REQUIRED|ACTION)\b', re.IGNORECASE)
+
+# Lines after the item header that make up its text
+WINDOW_LINES = 6
+
+
+def clean_text(raw):
+    text = DATE.sub('', raw)
+    text = NOISE.sub('', text)
+    text = REGISTRATION.sub('', text)
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def split_defect(text):
+    # Separation heuristic: defect vs description, split on the first status
+    # word ("INOP", "LIMIT", ...) or after the first 4 words
+    status_split = STATUS_WORD.split(text, 1)
+    if len(status_split) > 1:
+        return status_split[0].strip(), (status_split[1] + status_split[2]).strip()
+    words = text.split()
+    if len(words) > 4:
+        return " ".join(words[:4]), " ".join(words[4:])
+    return text, ""
+
+
+class MelParser:
+    # Streaming deferred-item parser: feed() one MEL page at a time. The
+    # first occurrence of each MEL number wins; an item whose text window
+    # runs off the end of a page is completed from the next page, if the
+    # page fed next is the one right after it.
+    def __init__(self):
+        self.items = []
+        self._by_number = {}
+        self._open = None  # (item, lines) still short of WINDOW_LINES
+        self._last_page = None
+
+    def feed(self, text, page=None):
+        # page: number of the page in the document; without it pages are
+        # taken to be consecutive
+        if page is not None and self._last_page is not None and page != self._last_page + 1:
+            self._open = None
+        self._last_page = page
+        parts = MEL_HEADER.split(text)
+        if self._open is not None:
+            self._continue(parts[0])
+            if len(parts) > 1:
+                # A new item header ends the previous item
+                self._open = None
+        for i in range(1, len(parts), 3):
+            number, level, content = parts[i], parts[i + 1], parts[i + 2]
+            if number in self._by_number:
+                continue
+            lines = content.split('\n')[:WINDOW_LINES]
+            item = {'number': number, 'level': level}
+            self._set_text(item, lines)
+            self._by_number[number] = item
+            self.items.append(item)
+            # Only the last item on a page can continue onto the next one
+            if i + 3 >= len(parts) and len(lines) < WINDOW_LINES:
+                self._open = (item, lines)
+        return self.items
+
+    def _continue(self, head):
+        # Leading text of the next page, minus the repeated page header
+        item, lines = self._open
+        self._open = None
+        extra = [l for l in head.split('\n') if l.strip() and not PAGE_HEADER.search(l) and clean_text(l)]
+        if extra:
+            lines = lines + extra[:WINDOW_LINES - len(lines)]
+            self._set_text(item, lines)
+            if len(lines) < WINDOW_LINES:
+                self._open = (item, lines)
+
+    def _set_text(self, item, lines):
+        raw = " ".join(l.strip() for l in lines).strip()
+        item['defect'], item['description'] = split_defect(clean_text(raw))
@@ -0,0 +1,98 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Nav log layout: a position line ("WP012", "DOKIR") followed by its data
+# line, which starts with the coordinates:
+#   S3512.4W07233.1 M52 248/029 07 845 41.2 0712 61234 10450
+COORDINATE_START = r'[SN]\d{4}'
+POSITION = r'^([A-Z0-9]{3,7})\b'
+# Header and page furniture lines that look like positions
+NOT_A_POSITION = '|'.join(map(re.escape, ["PAGE", "LATAM", "RELEASE", "FREQ", "COORD", "POSN", "POS"]))
+# Columns after the wind are WSR, DTGO, ACBOF, ACT, then whatever follows
+DATA_ROW = (
+    r'^(?P<coord>\S+)(?P<before_wind>(?:\s+\S+)*?)'
+    r'\s+(?P<wind_dir>\d{3})/(?P<wind_speed>\d{3})(?!\S)'
+    r'(?:\s+(?P<wsr>\S+))?(?:\s+(?P<dtgo>\S+))?(?:\s+(?P<acbof>\S+))?(?:\s+(?P<act>\S+))?'
+    r'(?:\s+(?P<extra>.*))?$'
+)
+TEMPERATURE = r'(?<!\S)([MP]S?\d{2})(?!\S)'
+
+COLUMNS = ['posn', 'coord', 'temp', 'wind_dir', 'wind_speed', 'wsr', 'dtgo', 'acbof', 'act', 'extra']
+
+
+def parse_navlog(text, check=None):
+    # One row per waypoint data line, with the position carried forward from
+    # the line above. Columns that do not parse are left missing. check, if
+    # given, is called between the column passes and may raise to abandon
+    # the parse.
+    check = check or (lambda: None)
+    lines = pd.Series(text.split('\n'), dtype=object).str.strip()
+    lines = lines[lines != '']
+    is_data = lines.str.match(COORDINATE_START)
+    check()
+
+    posn = lines.str.extract(POSITION, expand=False)
+    posn = posn.where(~is_data & ~lines.str.contains(NOT_A_POSITION)).ffill().fillna('N/A')
+    check()
+
+    rows = lines[is_data].str.extract(DATA_ROW)
+    check()
+    rows = rows[rows['wind_dir'].notna()]
+    if rows.empty:
+        return pd.DataFrame({column: pd.Series(dtype=object) for column in COLUMNS})
+
+    navlog = pd.DataFrame({
+        'posn': posn[rows.index],
+        'coord': rows['coord'],
+        'temp': rows['before_wind'].str.extract(TEMPERATURE, expand=False),
+        'wind_dir': rows['wind_dir'].astype(int),
+        'wind_speed': rows['wind_speed'].astype(int),
+        'wsr': pd.to_numeric(rows['wsr'].where(rows['wsr'].str.fullmatch(r'\d+')), errors='coerce').astype('Int64'),
+        'dtgo': pd.to_numeric(rows['dtgo'], errors='coerce'),
+        'acbof': pd.to_numeric(rows['acbof'], errors='coerce'),
+        'act': rows['act'].where(rows['act'].str.fullmatch(r'\d{4}')),
+        'extra': rows['extra'],
+    })
+    navlog['act'] = navlog['act'].str[:2] + ':' + navlog['act'].str[2:]
+    return navlog.reset_index(drop=True)
+
+
+def turbulence_summary(navlog):
+    # Returns (max grade "07", "POSN (HH:MM)", {grade: [points]}) where the
+    # max is the first waypoint with the highest WSR and the dict lists every
+    # waypoint at 06 or above, once per grade, in route order
+    graded = navlog[navlog['wsr'].notna()]
+    max_turb, max_loc = 0, "N/A (N/A)"
+    if not graded.empty and graded['wsr'].max() > 0:
+        worst = graded.loc[graded['wsr'].idxmax()]
+        max_turb = int(worst['wsr'])
+        max_loc = f"{worst['posn']} ({worst['act'] if pd.notna(worst['act']) else 'N/A'})"
+
+    severe = graded[graded['wsr'] >= 6].drop_duplicates(['posn', 'wsr'])
+    repeated = {
+        str(int(grade)): [
+            {'grado': int(grade), 'punto': posn, 'eet': act if pd.notna(act) else 'N/A'}
+            for posn, act in zip(points['posn'], points['act'])
+        ]
+        for grade, points in severe.groupby('wsr', sort=False)
+    }
+    return f"{max_turb:02d}", max_loc, repeated
+
+
+def wind_statistics(navlog):
+    # Route-wide wind: mean and max speed, and the vector-mean direction
+    if navlog.empty:
+        return None
+    radians = np.deg2rad(navlog['wind_dir'].astype(float))
+    speed = navlog['wind_speed'].astype(float)
+    mean_dir = np.rad2deg(np.arctan2((speed * np.sin(radians)).mean(), (speed * np.cos(radians)).mean())) % 360
+    strongest = navlog.loc[speed.idxmax()]
+    return {
+        'points': len(navlog),
+        'mean_speed': round(float(speed.mean()), 1),
+        'max_speed': int(strongest['wind_speed']),
+        'max_speed_posn': strongest['posn'],
+        'mean_direction': int(round(mean_dir)) % 360,
+    }
@@ -0,0 +1,116 @@
+import json
+import re
+from collections import namedtuple
+
+NotamRule = namedtuple('NotamRule', ['rule_id', 'pattern'])
+NotamHit = namedtuple('NotamHit', ['airport', 'rule_id', 'page', 'line_start', 'line_end', 'text'])
+
+# High-impact operational NOTAMs only
+DEFAULT_RULES = (
+    NotamRule('rwy_closed', r'RWY.*?CLOSED'),
+    NotamRule('ils_rwy_us', r'ILS.*?RWY.*?U/S'),
+    NotamRule('ils_us', r'ILS.*?U/S'),
+    NotamRule('loc_us', r'LOC.*?U/S'),
+    NotamRule('gp_us', r'GP.*?U/S'),
+    NotamRule('curfew', r'CURFEW'),
+    NotamRule('not_avbl_departure', r'NOT\s+AVBL\s+FOR\s+DEPARTURE'),
+    NotamRule('north_end_closed', r'NORTH\s+END\s+CLOSED'),
+    NotamRule('south_end_closed', r'SOUTH\s+END\s+CLOSED'),
+    NotamRule('sistemas_inop', r'SISTEMAS\s+INOP'),
+)
+
+# Airport header, e.g. "SCEL -SCL - SANTIAGO INTL"
+AIRPORT_HEADER = re.compile(r'^([A-Z]{4})\s+-\s*([A-Z]{3})?\s*-')
+PAGE_MARKER = re.compile(r'^--- PAGE (\d+) ---$')
+# Flags for the whole pattern, e.g. "(?i)", cannot be spliced into the alternation
+GLOBAL_FLAGS = re.compile(r'^\(\?[aiLmsux]+\)')
+BACKREFERENCE = re.compile(r'(?<!\\)\\[1-9]')
+_WHITESPACE = re.compile(r'\s+')
+CHECK_EVERY = 256
+
+
+class NotamRuleEngine:
+    def __init__(self, rules=DEFAULT_RULES):
+        self.rules = tuple(rules)
+        if not self.rules:
+            raise ValueError("NotamRuleEngine needs at least one rule")
+        for rule in self.rules:
+            validate_rule(rule)
+        # All rules folded into one alternation: a single search per line,
+        # and lastgroup tells which rule fired. Matching ignores case, so
+        # rules may be written in either.
+        self._pattern = re.compile('|'.join(
+            f'(?P<r{i}>{rule.pattern})' for i, rule in enumerate(self.rules)), re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path, include_defaults=True):
+        # JSON list of {"id": "...", "pattern": "..."} objects
+        with open(path, encoding='utf-8') as f:
+            extra = [NotamRule(r['id'], r['pattern']) for r in json.load(f)]
+        return cls((DEFAULT_RULES if include_defaults else ()) + tuple(extra))
+
+    def scan(self, text, current_apt="UNKNOWN", check=None):
+        # check, if given, is called every CHECK_EVERY lines and may raise to
+        # abandon the scan (see HighPrecisionPDFExtractor._check_budget)
+        lines = text.split('\n')
+        search = self._pattern.search
+        hits = []
+        seen = set()
+        page, page_line = None, 0
+
+        for i in range(len(lines)):
+            if check is not None and i % CHECK_EVERY == 0:
+                check()
+            line = lines[i].strip()
+            page_line += 1
+            page_match = PAGE_MARKER.match(line)
+            if page_match:
+                page, page_line = int(page_match.group(1)), 0
+                continue
+
+            apt_match = AIRPORT_HEADER.match(line.upper())
+            if apt_match:
+                current_apt = apt_match.group(1)
+
+            match = search(line)
+            if not match:
+                continue
+
+            # Capture just the matching line and the one after for concise context
+            context = lines[i:min(len(lines), i + 2)]
+            notam_text = _WHITESPACE.sub(' ', " ".join([c.strip() for c in context]).strip())
+
+            # Deduplicate and filter out obvious noisy strings
+            if not notam_text or len(notam_text) <= 10:
+                continue
+            # Skip if it's just about TWY or secondary lights unless it mentions RWY CLOSED
+            upper = notam_text.upper()
+            if 'TWY' in upper and 'RWY' not in upper and 'CLOSED' not in upper:
+                continue
+
+            key = (current_apt, notam_text)
+            if key in seen:
+                continue
+            seen.add(key)
+            rule_id = self.rules[int(match.lastgroup[1:])].rule_id
+            hits.append(NotamHit(current_apt, rule_id, page, page_line, page_line + len(context) - 1, notam_text))
+        return hits
+
+
+def validate_rule(rule):
+    # Checked one by one, so a bad user rule names itself instead of breaking
+    # the combined pattern for every rule
+    try:
+        compiled = re.compile(rule.pattern)
+    except re.error as e:
+        raise ValueError(f"NOTAM rule '{rule.rule_id}': invalid pattern: {e}") from None
+    if compiled.groupindex:
+        raise ValueError(f"NOTAM rule '{rule.rule_id}': named groups are not supported")
+    if BACKREFERENCE.search(rule.pattern):
+        # Group numbers shift once the rule sits inside the alternation
+        raise ValueError(f"NOTAM rule '{rule.rule_id}': backreferences are not supported")
+    if GLOBAL_FLAGS.match(rule.pattern):
+        raise ValueError(f"NOTAM rule '{rule.rule_id}': use scoped flags such as (?i:...) instead of global ones")
+
+
+DEFAULT_ENGINE = NotamRuleEngine()
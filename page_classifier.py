@@ -0,0 +1,63 @@
+import re
+
+from pdf_backends import PyMuPDFBackend, normalize_source
+
+# Bump when the labels a page gets can change (invalidates cached labels)
+CLASSIFIER_VERSION = "1"
+
+PAGE_LABELS = ('crew', 'release', 'flight_line', 'navlog', 'weights', 'mel', 'weather', 'notam')
+
+# One scan of the page's unsorted text; each alternative is what the parser
+# for that page type looks for (same markers as section_index)
+_LABEL_MARKERS = re.compile(
+    r'(?P<crew>Cockpit Crew)'
+    r'|(?P<flight_line>[A-Z]{3}\d{3,4}\s+\d{2}[A-Z]{3}\d{2}\s+[A-Z]{5})'
+    r'|(?P<release>\bDEST\s+[A-Z]{4}|\bFlight\s|Acft\.\s+Regist|[A-Z]{4}R\d{2}[LRC])'
+    r'|(?P<navlog>^[ \t]*[SN]\d{4}[^\n]*?\b\d{3}/\d{3}\b)'
+    r'|(?P<weights>\b[EM](?:ZFW|TOW|LDW)\b)'
+    r'|(?P<mel>DEFERRED ITEM LIST|Operational Limitations Report)'
+    r'|(?P<weather>^[ \t]*[A-Z]{4}[ \t]+-[ \t]*(?:[A-Z]{3})?[ \t]*-|^[ \t]*(?:SA|SP|FT|FC|METAR|SPECI|TAF)\s+\d{6}Z)'
+    r'|(?P<notam>NOTAM)',
+    re.MULTILINE)
+
+
+def classify_text(text):
+    # Labels in PAGE_LABELS order, or ['other'] for pages no parser needs
+    found = {match.lastgroup for match in _LABEL_MARKERS.finditer(text)}
+    return [label for label in PAGE_LABELS if label in found] or ['other']
+
+
+def mark_notam_annex(labels):
+    # NOTAM annexes run to the end of the package once they start, so later
+    # pages are kept for the NOTAM scan whatever else they contain
+    in_annex = False
+    for page_labels in labels:
+        if 'notam' in page_labels:
+            in_annex = True
+        elif in_annex:
+            page_labels[:] = [label for label in page_labels if label != 'other'] + ['notam']
+    return labels
+
+
+def classify_pages(source, cache=None):
+    # One label list per page. With a ResultCache the labels are stored under
+    # the PDF's content hash, so repeat runs skip the pass entirely.
+    source = normalize_source(source)
+    key = None
+    if cache is not None:
+        if isinstance(source, bytes):
+            data = source
+        else:
+            with open(source, 'rb') as f:
+                data = f.read()
+        key = cache.make_key(data, CLASSIFIER_VERSION, 'pages')
+        labels = cache.get(key)
+        if labels is not None:
+            return labels
+
+    with PyMuPDFBackend(source) as backend:
+        labels = mark_notam_annex([classify_text(backend.raw_text(i)) for i in range(backend.page_count())])
+
+    if cache is not None:
+        cache.put(key, labels)
+    return labels
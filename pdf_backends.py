@@ -0,0 +1,202 @@
+import hashlib
+import io
+import os
+import re
+import threading
+from collections import namedtuple
+
+# PyMuPDF and pdfplumber are imported on first use: each costs more
+# than the app's first render, and many runs never touch pdfplumber
+
+# Text of a single page as the parsers see it, whatever engine produced it
+PageText = namedtuple('PageText', ['number', 'text', 'engine'])
+
+ENGINES = ('auto', 'pymupdf', 'pdfplumber')
+
+# MuPDF is not thread-safe: every PyMuPDF call in the process goes through
+# this lock, so extractions in threads (see extraction_jobs) only overlap in
+# pdfplumber and in parsing
+PYMUPDF_LOCK = threading.RLock()
+
+# Pages whose parsers rely on pdfplumber's column layout
+# (crew block on page 1 and the nav log WIND/WSR/ACT columns)
+LAYOUT_SENSITIVE_MARKERS = re.compile(r'Cockpit Crew|\bPOSN\b|\bCOORD\b|\bWSR\b')
+
+
+def normalize_source(source):
+    # Paths stay paths; in-memory PDFs (bytes, bytearray, memoryview, BytesIO
+    # or any binary file object) become bytes so both engines and pool
+    # workers can open them without a temp file
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, io.BytesIO):
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        return source.read()
+    raise TypeError(f"Unsupported PDF source type: {type(source).__name__}")
+
+
+class ExtractionBackend:
+    name = None
+
+    def __init__(self, source, low_memory=False):
+        self.source = source
+        # Drop each page's parsed objects as soon as its text is taken
+        self.low_memory = low_memory
+        self._doc = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def open(self):
+        raise NotImplementedError
+
+    def close(self):
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+    def page_count(self):
+        raise NotImplementedError
+
+    def page_text(self, index):
+        raise NotImplementedError
+
+    def page(self, index):
+        return PageText(index + 1, self.page_text(index), self.name)
+
+
+class PyMuPDFBackend(ExtractionBackend):
+    name = 'pymupdf'
+
+    def open(self):
+        import pymupdf
+        with PYMUPDF_LOCK:
+            if isinstance(self.source, bytes):
+                self._doc = pymupdf.open(stream=self.source, filetype='pdf')
+            else:
+                self._doc = pymupdf.open(self.source)
+
+    def close(self):
+        with PYMUPDF_LOCK:
+            super().close()
+
+    def page_count(self):
+        with PYMUPDF_LOCK:
+            return self._doc.page_count
+
+    def page_text(self, index):
+        with PYMUPDF_LOCK:
+            # sort=True keeps reading order top-to-bottom, left-to-right like pdfplumber
+            text = self._doc.load_page(index).get_text("text", sort=True) or ""
+            if self.low_memory:
+                # Empty MuPDF's object store (fonts, images, parsed content)
+                import pymupdf
+                pymupdf.TOOLS.store_shrink(100)
+        return text
+
+    def content_hash(self, index, text=None):
+        # Identifies a page across revisions of a release: its content
+        # streams, the form XObjects they draw (pages built with
+        # show_pdf_page have a one-line content stream), the page box and
+        # the raw text, so two pages only match when they read the same.
+        # Pass text when raw_text(index) is already at hand.
+        with PYMUPDF_LOCK:
+            page = self._doc.load_page(index)
+            digest = hashlib.sha256(page.read_contents())
+            for xref, _, _, _ in page.get_xobjects():
+                digest.update(self._doc.xref_stream(xref) or b'')
+            digest.update(repr(tuple(page.rect)).encode())
+            digest.update((self.raw_text(index) if text is None else text).encode('utf-8'))
+        return digest.hexdigest()
+
+    def raw_text(self, index):
+        # Content-stream order, no sorting: much cheaper, fine for marker searches
+        with PYMUPDF_LOCK:
+            return self._doc.load_page(index).get_text("text") or ""
+
+
+class PdfPlumberBackend(ExtractionBackend):
+    name = 'pdfplumber'
+
+    def open(self):
+        import pdfplumber
+        if isinstance(self.source, bytes):
+            self._doc = pdfplumber.open(io.BytesIO(self.source))
+        else:
+            self._doc = pdfplumber.open(self.source)
+
+    def page_count(self):
+        return len(self._doc.pages)
+
+    def page_text(self, index):
+        page = self._doc.pages[index]
+        text = page.extract_text() or ""
+        if self.low_memory:
+            # pdfplumber keeps chars and layout objects cached on every page
+            # until the document closes
+            page.close()
+        return text
+
+
+class AutoBackend(ExtractionBackend):
+    # PyMuPDF for every page, pdfplumber only for layout-sensitive ones
+    name = 'auto'
+
+    def __init__(self, source, low_memory=False):
+        super().__init__(source, low_memory)
+        self._fast = PyMuPDFBackend(source, low_memory)
+        self._layout = None
+
+    def open(self):
+        self._fast.open()
+
+    def close(self):
+        self._fast.close()
+        if self._layout is not None:
+            self._layout.close()
+            self._layout = None
+
+    def page_count(self):
+        return self._fast.page_count()
+
+    def page(self, index):
+        text = self._fast.page_text(index)
+        if text.strip() and not LAYOUT_SENSITIVE_MARKERS.search(text):
+            return PageText(index + 1, text, self._fast.name)
+        if self._layout is None:
+            self._layout = PdfPlumberBackend(self.source, self.low_memory)
+            self._layout.open()
+        return self._layout.page(index)
+
+    def page_text(self, index):
+        return self.page(index).text
+
+
+BACKENDS = {
+    'auto': AutoBackend,
+    'pymupdf': PyMuPDFBackend,
+    'pdfplumber': PdfPlumberBackend,
+}
+
+
+def open_backend(engine, source, low_memory=False):
+    try:
+        backend_cls = BACKENDS[engine]
+    except KeyError:
+        raise ValueError(f"Unknown extraction engine '{engine}', expected one of {', '.join(ENGINES)}")
+    return backend_cls(normalize_source(source), low_memory)
+
+
+def extract_pages(engine, source, indexes, low_memory=False):
+    # Runs in a pool worker: each worker opens the document on its own
+    with open_backend(engine, source, low_memory) as backend:
+        return [backend.page(i) for i in indexes]
@@ -1,72 +1,808 @@
-import pdfplumber
-import fitz  # PyMuPDF
 import re
 import json
 import os
+import sys
+import hashlib
+import cProfile
+import io
+import logging
+import pstats
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from notam_rules import DEFAULT_ENGINE, NotamRuleEngine
+from page_classifier import classify_pages, classify_text, mark_notam_annex
+from pdf_backends import PageText, PyMuPDFBackend, extract_pages, normalize_source, open_backend
+from result_cache import content_digest
+from revision_store import summary_diff
+from route_index import RouteIndex
+from mel_parser import MelParser
+from section_index import SectionIndex
+from weather_parser import WeatherIndex, format_wind
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a parser change alters the summary, so cached results are not reused
+EXTRACTOR_VERSION = "1.6.2"
+
+# Below this many pages the process pool startup costs more than it saves
+PARALLEL_MIN_PAGES = 24
+
+# Seconds one stage (summed over its pages) and one whole extraction may run
+# before being cut off; None disables the budget
+DEFAULT_STAGE_BUDGET = 30.0
+DEFAULT_TOTAL_BUDGET = 120.0
+# Status of each field in summary['estado_campos'], best to worst
+FIELD_STATUSES = ('ok', 'partial', 'timeout', 'error')
+
+
+# Summary fields each parsing stage fills in. Page stages run while pages
+# are read, document stages once the section index is built.
+STAGE_FIELDS = {
+    'crew': ('tripulacion',),
+    'flight_line': ('vuelo', 'matricula', 'fecha', 'origen', 'destino'),
+    'mel': ('mel_items',),
+    'basic': ('vuelo', 'matricula', 'origen', 'destino', 'tiempo_vuelo', 'viento_arribo', 'pista_uso', 'alternos'),
+    'turbulence': ('turbulencia_max', 'turbulencia_loc', 'turbulencias_severas', 'turbulencias_repetidas'),
+    'weights': ('limitacion_peso', 'limitacion_valor', 'limitacion_margen', 'limitacion_critica'),
+    'met': ('meteorologia',),
+    'notams': ('notams_criticos', 'notams_detalle'),
+}
+PAGE_STAGES = ('crew', 'flight_line', 'mel')
+DOCUMENT_STAGES = ('basic', 'turbulence', 'weights', 'met', 'notams')
+# Document-wide passes the document stages build on; a stage cannot run
+# when one of its passes failed
+STAGE_PREREQUISITES = {
+    'basic': ('section_index', 'weather_index'),
+    'turbulence': ('section_index',),
+    'weights': ('section_index',),
+    'met': ('section_index', 'weather_index'),
+    'notams': ('section_index',),
+}
+BUDGET_STAGES = tuple(STAGE_FIELDS) + ('section_index', 'weather_index')
+
+FIELD_STAGES = {}
+for _stage, _fields in STAGE_FIELDS.items():
+    for _field in _fields:
+        FIELD_STAGES.setdefault(_field, []).append(_stage)
+
+# Page types (see page_classifier) each stage reads. Pages of no type the
+# requested stages need are never extracted.
+STAGE_PAGES = {
+    'crew': ('crew',),
+    'flight_line': ('flight_line',),
+    'mel': ('mel',),
+    'basic': ('release', 'weather'),
+    'turbulence': ('navlog',),
+    'weights': ('weights',),
+    'met': ('weather',),
+    'notams': ('notam',),
+}
+# Besides its own pages, a stage's result depends on these: the release
+# fallback only fills what the flight line left empty, and the NOTAM scan
+# starts under the last airport header before the annex
+STAGE_EXTRA_PAGES = {
+    'basic': ('flight_line',),
+    'notams': ('weather',),
+}
+WEIGHT_TOKENS = re.compile(r'\b([EM](?:ZFW|TOW|LDW))\s+\d+')
+# Flight summary line, e.g. "LAN809 02FEB26 CCBGE LA789 SCEL 0425 YSSY 1915"
+FLIGHT_LINE = re.compile(
+    r'([A-Z]{3}\d{3,4})\s+(\d{2})([A-Z]{3})(\d{2})\s+([A-Z]{2}[A-Z]{3})'
+    r'(?:\s+[A-Z0-9]+\s+([A-Z]{4})\s+\d{4}\s+([A-Z]{4})\s+\d{4})?')
+MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+
+
+def default_summary():
+    return {
+        'vuelo': 'N/A',
+        'matricula': 'N/A',
+        'fecha': 'N/A',
+        'origen': 'N/A',
+        'destino': 'N/A',
+        'tiempo_vuelo': 'N/A',
+        'viento_arribo': '000/00',
+        'pista_uso': 'N/A',
+        'alternos': [],
+        'limitacion_peso': 'N/A',
+        'limitacion_valor': '0',
+        'limitacion_margen': '0',
+        'limitacion_critica': False,
+        'tripulacion': [],
+        'turbulencia_max': '00',
+        'turbulencia_loc': 'N/A',
+        'turbulencias_severas': [],
+        'turbulencias_repetidas': {},
+        'mel_items': [],
+        'meteorologia': [],
+        'notams_criticos': [],
+        'notams_detalle': [],
+        'estado_campos': {},
+    }
+
+
+class StageTimeout(Exception):
+    pass
+
+
+def _raise_stage_timeout(signum, frame):
+    raise StageTimeout()
+
+
+def incomplete_fields(summary):
+    # {field: status} for the fields that did not come out complete
+    return {field: status for field, status in summary.get('estado_campos', {}).items() if status != 'ok'}
+
+
+def peak_rss():
+    # Peak resident set size of this process in bytes (None where unavailable).
+    # It is a process-wide high-water mark: measure one extraction per process.
+    try:
+        # Linux: VmHWM starts over in a new process, while ru_maxrss carries
+        # the parent's peak across fork/exec
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def build_full_text(pages):
+    # Same layout the parsers have always seen: one marker line per page
+    return "".join(f"\n--- PAGE {p.number} ---\n{p.text}" for p in pages)
+
 
 class HighPrecisionPDFExtractor:
-    def __init__(self, pdf_path):
-        self.pdf_path = pdf_path
-        self.summary = {
-            'vuelo': 'N/A',
-            'matricula': 'N/A',
-            'tiempo_vuelo': 'N/A',
-            'viento_arribo': '000/00',
-            'pista_uso': 'N/A',
-            'limitacion_peso': 'N/A',
-            'limitacion_valor': '0',
-            'limitacion_margen': '0',
-            'limitacion_critica': False,
-            'tripulacion': [],
-            'turbulencia_max': '00',
-            'turbulencia_loc': 'N/A',
-            'turbulencias_severas': [],
-            'turbulencias_repetidas': {},
-            'mel_items': [],
-            'meteorologia': [],
-            'notams_criticos': []
-        }
-        self._extract_all()
+    def __init__(self, pdf_path, engine='auto', parallel=False, workers=None,
+                 parallel_min_pages=PARALLEL_MIN_PAGES, notam_rules=None, lazy=False, profile=False,
+                 low_memory=False, page_cache=None, revisions=None,
+                 stage_budget=DEFAULT_STAGE_BUDGET, total_budget=DEFAULT_TOTAL_BUDGET, text_layer=None):
+        # pdf_path may also be the PDF itself: bytes, BytesIO or memoryview
+        # (None only through from_text_layer)
+        self.pdf_path = normalize_source(pdf_path) if pdf_path is not None else None
+        self.engine = engine
+        if isinstance(notam_rules, str):
+            notam_rules = NotamRuleEngine.from_file(notam_rules)
+        self.notam_rules = notam_rules or DEFAULT_ENGINE
+        self.parallel = parallel
+        self.workers = workers or os.cpu_count() or 1
+        self.parallel_min_pages = parallel_min_pages
+        # Release each page's layout objects once its text is read (large packages)
+        self.low_memory = low_memory
+        # Optional ResultCache for page labels, so repeat runs skip classification
+        self.page_cache = page_cache
+        self.page_labels = None
+        # Optional RevisionStore: pages and stages unchanged since an earlier
+        # revision of the same release are reused instead of re-extracted
+        self.revisions = revisions
+        # stage_budget is one number for every stage or a {stage: seconds}
+        # dict (stages left out keep the default)
+        if isinstance(stage_budget, dict):
+            self.stage_budgets = {stage: stage_budget.get(stage, DEFAULT_STAGE_BUDGET) for stage in BUDGET_STAGES}
+        else:
+            self.stage_budgets = dict.fromkeys(BUDGET_STAGES, stage_budget)
+        self.total_budget = total_budget
+        # stage -> ok/partial/timeout/error, see summary['estado_campos']
+        self.stage_status = {}
+        # stage -> fields asked of extract() when the stage stopped early on
+        # them; its other fields are 'partial'
+        self._short_stages = {}
+        self._stage_spent = {}
+        self._deadline = None
+        self._stage_deadline = None
+        self._read_cut_off = False
+        # Optional TextLayerStore: page texts are read from the PDF's sidecar
+        # when there is one, and a sidecar is written after a full extraction
+        self.text_layer = text_layer
+        self.layer = None
+        self._digest = None
+        self.page_hashes = None
+        self.previous = None
+        self.changes = None
+        self._raw_labels = None
+        self._stored_pages = {}
+        self.pages = []
+        self.sections = None
+        self.weather = None
+        self.route = None
+        self.mel = None
+        self.navlog = None
+        self.error = None
+        self.complete = False
+        self.profile = profile
+        self.metrics = {'stages': {}}
+        self.summary = default_summary()
+        if not lazy:
+            self._extract_all()
+
+    @classmethod
+    def from_text_layer(cls, layer, lazy=False, **options):
+        # Runs the parsers on a stored text layer (see text_layer.py) without
+        # the PDF, e.g. to re-analyse an archive after a rule change. The page
+        # texts came from the layer's engine, whatever options ask for.
+        options['engine'] = layer.engine
+        extractor = cls(None, lazy=True, **options)
+        extractor.layer = layer
+        if not lazy:
+            extractor._extract_all()
+        return extractor
 
     def _extract_all(self):
         try:
-            with pdfplumber.open(self.pdf_path) as pdf:
-                full_text = ""
-                for i, page in enumerate(pdf.pages):
-                    text = page.extract_text() or ""
-                    full_text += f"\n--- PAGE {i+1} ---\n{text}"
-                    
-                    if i == 0:
-                        self._extract_crew(text)
-                    
-                    # Page 13 usually has the clean flight summary line
-                    if i == 12: 
-                        self._extract_flight_summary_line(text)
-                    
-                    if "DEFERRED ITEM LIST" in text or "Operational Limitations Report" in text:
-                        self._extract_mel_advanced(text)
-                
-                self.summary['notams_criticos'] = []
-                self._extract_basic_info_fallback(full_text)
-                self._extract_turbulence(full_text)
-                self._extract_weights_advanced(full_text)
-                self._extract_met_advanced(full_text)
-                self._extract_notams_advanced(full_text)
-                
+            self._run_stages(STAGE_FIELDS)
+            self.complete = True
         except Exception as e:
-            print(f"Error extracting PDF data: {e}")
+            self.error = e
+            logger.error("Error extracting PDF data: %s", e)
+
+    def extract(self, fields=None):
+        # Only the stages behind the requested fields run, and page reading
+        # stops as soon as every requested field is settled
+        if fields is None:
+            return self.get_flight_summary()
+        fields = set(fields)
+        unknown = fields - set(FIELD_STAGES)
+        if unknown:
+            raise ValueError(f"Unknown summary fields: {', '.join(sorted(unknown))}")
+        if not self.complete:
+            stages = {stage for field in fields for stage in FIELD_STAGES[field]}
+            self._run_stages(stages, fields)
+        return {field: self.summary[field] for field in fields}
+
+    def get_changes(self):
+        # What changed since the earlier revision this release was matched
+        # to (see revision_store.summary_diff); None without one
+        if not self.complete and self.error is None:
+            self._extract_all()
+        return self.changes
+
+    def iter_results(self):
+        # Yields (field, value) as soon as each field is known: crew after
+        # page 1, flight line after page 13, MEL as its pages are read, then
+        # the document-level fields stage by stage
+        if self.complete:
+            yield from self.summary.items()
+            return
+        try:
+            for field in self._stage_events(STAGE_FIELDS, incremental=True):
+                yield field, self.summary[field]
+            self.complete = True
+        except Exception as e:
+            self.error = e
+            logger.error("Error extracting PDF data: %s", e)
+
+    def _run_stages(self, stages, fields=None, reuse=True):
+        profiler = cProfile.Profile() if self.profile else None
+        if profiler:
+            profiler.enable()
+        try:
+            for _ in self._stage_events(stages, fields, incremental=fields is not None, reuse=reuse):
+                pass
+        finally:
+            if profiler:
+                profiler.disable()
+                out = io.StringIO()
+                pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(30)
+                self.metrics['profile'] = out.getvalue()
+
+    @contextmanager
+    def _measure(self, stage, text="", pages=0):
+        # Accumulates per-stage wall time, call count and input size, and emits
+        # one structured log line per call so runs can be aggregated
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(stage, time.perf_counter() - start, pages, len(text))
+
+    @contextmanager
+    def _budget(self, stage):
+        # Cuts the stage off with StageTimeout once its own budget or the
+        # total one runs out. SIGALRM also interrupts a single runaway regex
+        # search, but only works on the main thread; elsewhere (Streamlit,
+        # job threads) long loops call _check_budget instead.
+        start = time.monotonic()
+        deadline = self._deadline
+        budget = self.stage_budgets.get(stage)
+        if budget is not None:
+            stage_deadline = start + budget - self._stage_spent.get(stage, 0.0)
+            deadline = stage_deadline if deadline is None else min(deadline, stage_deadline)
+        if deadline is not None and deadline <= start:
+            raise StageTimeout()
+        use_alarm = (deadline is not None and hasattr(signal, 'setitimer')
+                     and threading.current_thread() is threading.main_thread())
+        if use_alarm:
+            previous = signal.signal(signal.SIGALRM, _raise_stage_timeout)
+            signal.setitimer(signal.ITIMER_REAL, deadline - start)
+        self._stage_deadline = deadline
+        try:
+            yield
+            # Without SIGALRM a stage only stops at its _check_budget calls;
+            # one that finished past its deadline still overran
+            self._check_budget()
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+                signal.signal(signal.SIGALRM, previous if previous is not None else signal.SIG_DFL)
+            self._stage_deadline = None
+            self._stage_spent[stage] = self._stage_spent.get(stage, 0.0) + time.monotonic() - start
+
+    def _check_budget(self):
+        if self._stage_deadline is not None and time.monotonic() > self._stage_deadline:
+            raise StageTimeout()
+
+    def _out_of_time(self):
+        return self._deadline is not None and time.monotonic() > self._deadline
+
+    def _time_left(self):
+        return None if self._deadline is None else max(0.0, self._deadline - time.monotonic())
+
+    def _guarded(self, stage, text, pages, func, *args):
+        # Runs one stage within its budget. A stage that fails or runs out of
+        # time keeps what it had filled in and the extraction goes on with
+        # the others; returns whether it completed.
+        status = self.stage_status.get(stage)
+        if status not in (None, 'ok'):
+            return False
+        try:
+            with self._measure(stage, text, pages), self._budget(stage):
+                func(*args)
+        except StageTimeout:
+            # MEL pages parsed before the cut-off are still in the summary
+            self.stage_status[stage] = 'partial' if status == 'ok' else 'timeout'
+            logger.warning(json.dumps({'event': 'extract_stage_timeout', 'stage': stage}))
+            return False
+        except Exception:
+            self.stage_status[stage] = 'error'
+            logger.exception(json.dumps({'event': 'extract_stage_error', 'stage': stage}))
+            return False
+        self.stage_status[stage] = 'ok'
+        return True
+
+    def _field_status(self):
+        # A field filled by several stages (flight line and release fallback)
+        # is ok when any of them completed, otherwise it takes the worst status
+        statuses = {}
+        for field, stages in FIELD_STAGES.items():
+            ran = []
+            for stage in stages:
+                if stage not in self.stage_status:
+                    continue
+                status = self.stage_status[stage]
+                short = self._short_stages.get(stage)
+                if status == 'ok' and short is not None and field not in short:
+                    status = 'partial'
+                ran.append(status)
+            if ran:
+                statuses[field] = 'ok' if 'ok' in ran else max(ran, key=FIELD_STATUSES.index)
+        return statuses
+
+    def incomplete_fields(self):
+        return incomplete_fields(self.summary)
+
+    def _record(self, stage, elapsed, pages=0, chars=0):
+        entry = self.metrics['stages'].setdefault(stage, {'seconds': 0.0, 'calls': 0, 'pages': 0, 'chars': 0})
+        entry['seconds'] += elapsed
+        entry['calls'] += 1
+        entry['pages'] += pages
+        entry['chars'] += chars
+        logger.info(json.dumps({
+            'event': 'extract_stage',
+            'stage': stage,
+            'seconds': round(elapsed, 6),
+            'pages': pages,
+            'chars': chars,
+        }))
+
+    def get_navlog(self):
+        # Waypoint table behind the turbulence fields (pandas DataFrame)
+        if self.navlog is None:
+            # Also when the turbulence fields were reused from an earlier revision
+            self._run_stages(('turbulence',), STAGE_FIELDS['turbulence'], reuse=False)
+        return self.navlog
+
+    def get_metrics(self):
+        stages = {name: dict(entry) for name, entry in self.metrics['stages'].items()}
+        metrics = {
+            'engine': self.engine,
+            'pages': len(self.pages),
+            'skipped_pages': len(self.page_labels) - len(self.pages) if self.page_labels else 0,
+            'reused_pages': len(self._stored_pages),
+            'pdf_bytes': self._pdf_size(),
+            'text_chars': sum(len(p.text) for p in self.pages),
+            'total_seconds': sum(entry['seconds'] for entry in stages.values()),
+            'peak_rss': peak_rss(),
+            'stages': stages,
+        }
+        if 'profile' in self.metrics:
+            metrics['profile'] = self.metrics['profile']
+        return metrics
+
+    def _stage_events(self, stages, fields=None, incremental=False, reuse=True):
+        # Generator behind every extraction entry point; yields each summary
+        # field as soon as the stage producing it has run
+        for stage in stages:
+            for field in STAGE_FIELDS[stage]:
+                self.summary[field] = default_summary()[field]
+        if 'mel' in stages:
+            self.mel = None
+        for stage in tuple(stages) + ('section_index', 'weather_index'):
+            self.stage_status.pop(stage, None)
+            self._short_stages.pop(stage, None)
+        self._stage_spent = {}
+        self._deadline = None if self.total_budget is None else time.monotonic() + self.total_budget
+        self._read_cut_off = False
+
+        self._classify()
+        reused = self._reusable_stages(stages) if reuse else []
+        for stage in reused:
+            for field in STAGE_FIELDS[stage]:
+                self.summary[field] = json.loads(json.dumps(self.previous.summary[field]))
+            self.stage_status[stage] = 'ok'
+            yield from STAGE_FIELDS[stage]
+        run = [stage for stage in STAGE_FIELDS if stage in stages and stage not in reused]
+
+        indexes = self._wanted_pages(run)
+        if self.layer is not None:
+            self._stored_pages = {i: self.layer.pages[i] for i in indexes if i in self.layer.pages}
+        else:
+            self._stored_pages = self._pages_from_revisions(indexes)
+        pages = []
+        seen_weights = set()
+        settled = False
+        for page in self._iter_pages(indexes, incremental):
+            pages.append(page)
+            for stage in self._parse_page(page, run):
+                yield from STAGE_FIELDS[stage]
+            if fields is not None:
+                seen_weights.update(WEIGHT_TOKENS.findall(page.text))
+                if self._fields_settled(fields, page.number, seen_weights):
+                    settled = True
+                    break
+        cut_off = self._read_cut_off
+        if settled:
+            # The requested fields are final, the rest of these stages' fields
+            # only saw the pages read so far
+            read, unread = indexes[:len(pages)], indexes[len(pages):]
+            for stage in run:
+                if self._missed_pages(stage, read, unread) is not None:
+                    self._short_stages[stage] = set(fields)
+
+        self.pages = pages
+        for stage in self._parse_document(pages, run):
+            yield from STAGE_FIELDS[stage]
+        if cut_off:
+            self._mark_unread(run, indexes[:len(pages)], indexes[len(pages):])
+        self.summary['estado_campos'] = self._field_status()
+        yield 'estado_campos'
+        # A degraded result is not kept as a revision to build on
+        full_run = fields is None and set(stages) == set(STAGE_FIELDS)
+        if self.revisions is not None and self.page_hashes is not None and full_run and not self.incomplete_fields():
+            self._save_revision(run)
+        # The sidecar needs every page a parser reads, whatever the parsers made of them
+        if (self.text_layer is not None and self.layer is None and full_run and len(run) == len(STAGE_FIELDS)
+                and not cut_off):
+            self.text_layer.put(self._pdf_digest(), self.engine, self.page_labels, pages, self._pdf_size())
+
+    def _mark_unread(self, stages, read, unread):
+        # Stages with pages still unread when the total budget ran out
+        for stage in stages:
+            status = self._missed_pages(stage, read, unread)
+            if status is not None:
+                current = self.stage_status.get(stage, 'ok')
+                self.stage_status[stage] = max(current, status, key=FIELD_STATUSES.index)
+
+    def _missed_pages(self, stage, read, unread):
+        # None when none of the stage's pages is among the unread ones,
+        # otherwise 'partial' if some of them were read and 'timeout' if none
+        if stage in ('crew', 'flight_line'):
+            # Only parsed on their first page
+            first = self._first_page(stage)
+            return 'timeout' if first is not None and first - 1 in unread else None
+        labels = set(STAGE_PAGES[stage])
+        if not any(labels.intersection(self.page_labels[i]) for i in unread):
+            return None
+        return 'partial' if any(labels.intersection(self.page_labels[i]) for i in read) else 'timeout'
+
+    def _reusable_stages(self, stages):
+        # Stages whose input pages are identical (same content at the same
+        # page number) in the earlier revision
+        if self.previous is None:
+            return []
+        return [stage for stage in STAGE_FIELDS
+                if stage in stages and self.previous.signatures.get(stage) == self._stage_signature(stage)]
+
+    def _stage_signature(self, stage):
+        labels = set(STAGE_PAGES[stage]) | set(STAGE_EXTRA_PAGES.get(stage, ()))
+        if stage == 'notams' and not any('notam' in page_labels for page_labels in self.page_labels):
+            # Without a NOTAM annex the scan falls back to the whole document
+            labels = None
+        return tuple(
+            (i + 1, page_hash)
+            for i, (page_hash, page_labels) in enumerate(zip(self.page_hashes, self.page_labels))
+            if labels is None or labels.intersection(page_labels)
+        )
+
+    def _pages_from_revisions(self, indexes):
+        # Text of the pages a stored revision already extracted, by index
+        if self.revisions is None:
+            return {}
+        pages = {}
+        for i in indexes:
+            stored = self.revisions.page(self.page_hashes[i], self.engine)
+            if stored is not None:
+                pages[i] = PageText(i + 1, stored[0], stored[1])
+        return pages
+
+    def _pdf_digest(self):
+        if self._digest is None and self.pdf_path is None:
+            self._digest = self.layer.digest
+        if self._digest is None:
+            data = self.pdf_path
+            if not isinstance(data, bytes):
+                with open(data, 'rb') as f:
+                    data = f.read()
+            self._digest = content_digest(data)
+        return self._digest
+
+    def _pdf_size(self):
+        if self.pdf_path is None:
+            return self.layer.pdf_bytes
+        return len(self.pdf_path) if isinstance(self.pdf_path, bytes) else os.path.getsize(self.pdf_path)
+
+    def _save_revision(self, run):
+        signatures = {stage: self._stage_signature(stage) for stage in STAGE_FIELDS}
+        previous = self.previous
+        self.revisions.add(self._pdf_digest(), self.engine, self.page_hashes, self._raw_labels,
+                           self.pages, self.summary, signatures)
+        if previous is not None:
+            previous_hashes = set(previous.page_hashes)
+            self.changes = {
+                'revision_anterior': previous.digest[:12],
+                'paginas_modificadas': [i + 1 for i, page_hash in enumerate(self.page_hashes)
+                                        if page_hash not in previous_hashes],
+                'etapas_recalculadas': run,
+            }
+            self.changes.update(summary_diff(previous.summary, self.summary))
+
+    def _classify(self):
+        if self.page_labels is None:
+            start = time.perf_counter()
+            if self.layer is None and self.text_layer is not None:
+                self.layer = self.text_layer.get(self._pdf_digest(), self.engine)
+            if self.layer is not None:
+                # Labels were stored with the page texts, NOTAM annex already marked
+                self.page_labels = [list(page_labels) for page_labels in self.layer.labels]
+            elif self.revisions is not None:
+                self.page_labels = self._classify_revision()
+            else:
+                self.page_labels = classify_pages(self.pdf_path, self.page_cache)
+            self._record('classify', time.perf_counter() - start, len(self.page_labels))
+        return self.page_labels
+
+    def _classify_revision(self):
+        # Hashes every page (its raw text included) and classifies only the
+        # ones no stored revision has seen, then looks up the closest earlier
+        # revision
+        self.page_hashes = []
+        labels = []
+        with PyMuPDFBackend(self.pdf_path) as backend:
+            for i in range(backend.page_count()):
+                text = backend.raw_text(i)
+                page_hash = backend.content_hash(i, text)
+                stored = self.revisions.labels(page_hash)
+                self.page_hashes.append(page_hash)
+                labels.append(stored if stored is not None else classify_text(text))
+        self._raw_labels = [list(page_labels) for page_labels in labels]
+        self.previous = self.revisions.best_match(self.page_hashes, self.engine)
+        return mark_notam_annex(labels)
+
+    def _wanted_pages(self, stages):
+        # Indexes of the pages at least one of the stages reads
+        wanted = {label for stage in stages for label in STAGE_PAGES[stage]}
+        return [i for i, labels in enumerate(self._classify()) if wanted.intersection(labels)]
+
+    def _first_page(self, label):
+        # Number of the first page with this label; crew and the clean flight
+        # summary line are only parsed there
+        for i, labels in enumerate(self._classify()):
+            if label in labels:
+                return i + 1
+        return None
+
+    def _fields_settled(self, fields, page_number, seen_weights):
+        for field in fields:
+            if field == 'tripulacion':
+                crew_page = self._first_page('crew')
+                settled = crew_page is None or page_number >= crew_page
+            elif field in ('vuelo', 'matricula', 'origen', 'destino'):
+                # Without the summary line the release fallback has to run
+                line_page = self._first_page('flight_line')
+                settled = line_page is not None and page_number >= line_page and self.summary[field] != 'N/A'
+            elif field == 'fecha':
+                line_page = self._first_page('flight_line')
+                settled = line_page is None or page_number >= line_page
+            elif field.startswith('limitacion_'):
+                # First occurrence of each weight wins, so once all six are seen
+                # the remaining pages cannot change the result
+                settled = len(seen_weights) == 6
+            else:
+                settled = False
+            if not settled:
+                return False
+        return True
+
+    def _iter_pages(self, indexes, incremental=False):
+        # Pages an earlier revision already extracted are not read again
+        stored = self._stored_pages
+        missing = [i for i in indexes if i not in stored]
+        # Reading stops once the total budget runs out; the pages read so far
+        # are still parsed (see _stop_reading)
+        if not incremental:
+            start = time.perf_counter()
+            read = dict(zip(missing, self._read_pages(missing))) if missing else {}
+            self._record('read_pages', time.perf_counter() - start, len(read), sum(len(p.text) for p in read.values()))
+            if len(read) < len(missing):
+                self._stop_reading()
+            for i in indexes:
+                if i not in stored and i not in read:
+                    return
+                yield stored[i] if i in stored else read[i]
+            return
+        if not missing:
+            yield from (stored[i] for i in indexes)
+            return
+        with open_backend(self.engine, self.pdf_path, self.low_memory) as backend:
+            for i in indexes:
+                if i in stored:
+                    yield stored[i]
+                    continue
+                if self._out_of_time():
+                    self._stop_reading()
+                    return
+                start = time.perf_counter()
+                page = backend.page(i)
+                self._record('read_pages', time.perf_counter() - start, 1, len(page.text))
+                yield page
+
+    def _stop_reading(self):
+        # Reading is what outgrows a budget on large packages; the pages
+        # already read are parsed anyway, each stage within its own budget,
+        # and _mark_unread flags the stages that missed pages
+        self._read_cut_off = True
+        self._deadline = None
+
+    def _read_pages(self, indexes):
+        # The first pages of indexes, all of them unless the total budget runs out
+        if self.parallel and self.workers > 1 and len(indexes) >= self.parallel_min_pages:
+            return self._read_pages_parallel(indexes)
+        pages = []
+        with open_backend(self.engine, self.pdf_path, self.low_memory) as backend:
+            for i in indexes:
+                if self._out_of_time():
+                    break
+                pages.append(backend.page(i))
+        return pages
+
+    def _read_pages_parallel(self, indexes):
+        # Two chunks per worker keeps the pool busy when some pages are slower
+        chunk = max(1, -(-len(indexes) // (self.workers * 2)))
+        chunks = [indexes[start:start + chunk] for start in range(0, len(indexes), chunk)]
+        pages = []
+        pool = ProcessPoolExecutor(max_workers=min(self.workers, len(chunks)))
+        try:
+            futures = [pool.submit(extract_pages, self.engine, self.pdf_path, chunk, self.low_memory)
+                       for chunk in chunks]
+            # Collect in submission order so pages come back in document order
+            for future in futures:
+                try:
+                    pages.extend(future.result(timeout=self._time_left()))
+                except FutureTimeout:
+                    break
+        finally:
+            # After a cut-off, queued chunks never start and running ones
+            # finish in the background instead of holding up the result
+            pool.shutdown(wait=False, cancel_futures=True)
+        return pages
+
+    def _parse_page(self, page, stages):
+        # Returns the page stages that ran on this page
+        text = page.text
+        labels = self.page_labels[page.number - 1]
+        ran = []
+        if 'crew' in stages and page.number == self._first_page('crew'):
+            self._guarded('crew', text, 1, self._extract_crew, text)
+            ran.append('crew')
+
+        # First page with the clean flight summary line (page 13 in LATAM packages)
+        if 'flight_line' in stages and page.number == self._first_page('flight_line'):
+            self._guarded('flight_line', text, 1, self._extract_flight_summary_line, text)
+            ran.append('flight_line')
+
+        if 'mel' in stages and 'mel' in labels:
+            self._guarded('mel', text, 1, self._extract_mel_advanced, text, page.number)
+            ran.append('mel')
+        return ran
+
+    def _parse_document(self, pages, stages):
+        # Generator: yields each document stage once it has run. Each parser
+        # only scans the slice of the document it cares about.
+        # Stages that cannot run (a pass they need failed, or no time is left)
+        # take the status that stopped them and keep their default fields.
+        stages = [stage for stage in DOCUMENT_STAGES if stage in stages]
+        full_text = build_full_text(pages)
+        self.sections = None
+        self._guarded('section_index', full_text, len(pages), self._build_sections, full_text)
+        sections = self.sections
+        if sections is not None and ('basic' in stages or 'met' in stages):
+            # Basic info (arrival wind) and MET share one pass over the weather blocks
+            text = sections.text('weather')
+            self._guarded('weather_index', text, 0, self._build_weather, text)
+        for stage in stages:
+            blocked = [self.stage_status.get(step, 'timeout') for step in STAGE_PREREQUISITES[stage]
+                       if self.stage_status.get(step) != 'ok']
+            if blocked:
+                self.stage_status[stage] = blocked[0]
+            elif self._out_of_time():
+                self.stage_status[stage] = 'timeout'
+            elif stage == 'basic':
+                text = sections.text('release')
+                self._guarded('basic', text, 0, self._extract_basic_info_fallback, text, self.weather)
+            elif stage == 'turbulence':
+                text = sections.text('navlog')
+                self._guarded('turbulence', text, 0, self._extract_turbulence, text)
+            elif stage == 'weights':
+                text = sections.text('weights')
+                self._guarded('weights', text, 0, self._extract_weights_advanced, text)
+            elif stage == 'met':
+                text = sections.text('weather')
+                self._guarded('met', text, 0, self._extract_met_advanced, text, self.weather)
+            elif stage == 'notams':
+                notam_spans = sections.spans('notam')
+                first_apt = sections.airport_at(notam_spans[0][0]) if notam_spans else None
+                text = sections.text('notam', fallback_to_full=True)
+                self._guarded('notams', text, 0, self._extract_notams_advanced, text, first_apt or "UNKNOWN")
+            yield stage
+
+    def _build_sections(self, full_text):
+        self.sections = SectionIndex(full_text)
+
+    def _build_weather(self, text):
+        self.weather = WeatherIndex(text, self._check_budget)
 
     def _extract_flight_summary_line(self, text):
         # Sample: LAN809 02FEB26 CCBGE LA789 SCEL 0425 YSSY 1915
-        match = re.search(r'([A-Z]{3}\d{3,4})\s+\d{2}[A-Z]{3}\d{2}\s+([A-Z]{2}[A-Z]{3})', text)
+        match = FLIGHT_LINE.search(text)
         if match:
             self.summary['vuelo'] = match.group(1)
-            reg = match.group(2)
+            reg = match.group(5)
             if '-' not in reg and len(reg) == 5:
                 reg = f"{reg[:2]}-{reg[2:]}"
             self.summary['matricula'] = reg
+            day, month, year = match.group(2, 3, 4)
+            if month in MONTHS:
+                # ISO date so stored flights sort and filter by date
+                self.summary['fecha'] = f"20{year}-{MONTHS.index(month) + 1:02d}-{day}"
+            if match.group(6):
+                self.summary['origen'], self.summary['destino'] = match.group(6, 7)
+
+    def _extract_basic_info_fallback(self, text, weather=None):
+        if weather is None:
+            weather = WeatherIndex(text, self._check_budget)
 
-    def _extract_basic_info_fallback(self, text):
         if self.summary['vuelo'] == 'N/A':
             match = re.search(r'Flight\s+([A-Z0-9-]+)', text)
             if match: self.summary['vuelo'] = match.group(1)
@@ -77,32 +813,34 @@ class HighPrecisionPDFExtractor:
 
         # Total flight time from LATAM FLIGHT RELEASE section
         # Sample: DEST YSSY 82909 1351 (1351 is time)
-        time_match = re.search(r'DEST\s+[A-Z]{4}\s+\d+\s+(\d{2})(\d{2})', text)
+        time_match = re.search(r'DEST\s+([A-Z]{4})\s+\d+\s+(\d{2})(\d{2})', text)
         if time_match:
-            hh, mm = time_match.group(1), time_match.group(2)
+            hh, mm = time_match.group(2), time_match.group(3)
             self.summary['tiempo_vuelo'] = f"{hh}h {mm}m"
 
-        # Arrival Wind and Runway from Navigation Summary / Nav Log
-        # Sample: ... RIVET DCT YSSYR16L ... AVG WIND 248/029
-        # Destination YSSY is standard for this user based on log
-        
-        # 1. Runway: Look for YSSYR[Number][LRC]
-        rwy_match = re.search(r'YSSYR(\d{2}[LRC])', text)
-        if rwy_match:
-            self.summary['pista_uso'] = rwy_match.group(1)
-        
-        # 2. Wind: Look for YSSY METAR/TAF wind specifically
-        # Pattern: YSSY -SYD - SYDNEY K.SMITH.\nSA 020100Z 19023KT
-        wind_match = re.search(r'YSSY\s+-SYD\s+-.*?\nSA\s+\d{6}Z\s+([A-Z0-9]{5})KT', text, re.DOTALL)
-        if wind_match:
-            wind_raw = wind_match.group(1)
-            self.summary['viento_arribo'] = f"{wind_raw[:3]}/{wind_raw[3:]}"
-        else:
-            # Fallback to TAF if METAR SA is missing
-            taf_wind = re.search(r'YSSY\s+-SYD\s+-.*?\nFT\s+\d{6}Z\s+\d{4}\/\d{4}\s+([A-Z0-9]{5})KT', text, re.DOTALL)
-            if taf_wind:
-                wind_raw = taf_wind.group(1)
-                self.summary['viento_arribo'] = f"{wind_raw[:3]}/{wind_raw[3:]}"
+        # Origin, destination and alternates (see route_index): the flight
+        # summary line wins, the ORIG/DEST/ALTN lines fill what it left empty
+        route = self.route = RouteIndex(
+            text, weather,
+            origin=self.summary['origen'] if self.summary['origen'] != 'N/A' else None,
+            destination=self.summary['destino'] if self.summary['destino'] != 'N/A' else None,
+        )
+        if route.origin:
+            self.summary['origen'] = route.origin
+        if route.destination:
+            self.summary['destino'] = route.destination
+
+        # Runway in use from the route string, e.g. "... RIVET DCT YSSYR16L"
+        runway = route.runway(route.destination)
+        if runway:
+            self.summary['pista_uso'] = runway
+
+        # Arrival wind: destination METAR wind, TAF wind if the METAR is missing
+        wind = route.wind(route.destination)
+        if wind is not None:
+            self.summary['viento_arribo'] = format_wind(wind)
+
+        self.summary['alternos'] = route.alternates_conditions()
 
     def _extract_crew(self, text):
         # Improved crew extraction to handle Cockpit Crew specifically first
@@ -119,192 +857,34 @@ class HighPrecisionPDFExtractor:
                     name = match.group(2).strip()
                     self.summary['tripulacion'].append(f"{pos}: {name}")
 
-    def _extract_mel_advanced(self, text):
-        # Ultra-robust MEL parser
-        # Capture all possible variations of MEL headers
-        sections = re.split(r'(\d{2}-\d{2}-\d{2})\s+MEL\s+([A-D])\s*', text)
-        
-        if len(sections) > 1:
-            for i in range(1, len(sections), 3):
-                num = sections[i]
-                lvl = sections[i+1]
-                content = sections[i+2]
-                
-                # Take up to 6 lines to ensure we don't miss anything
-                content_lines = content.split('\n')[:6]
-                raw_full_text = " ".join([l.strip() for l in content_lines]).strip()
-                
-                # Heuristic cleanup: remove common PDF noise but keep potential description words
-                # Remove dates accurately
-                full_mel_text = re.sub(r'\d{2}/\d{2}/\d{1,4}', '', raw_full_text)
-                
-                # Remove PAGE/LATAM/RELEASE/MOC but don't strip everything
-                noise_patterns = [
-                    r'MOC\s*N?º?\s*\d+',
-                    r'PAGE\s+\d+',
-                    r'LATAM\s+OPERATIONAL.*?',
-                    r'MAINTENANCE\s+PROCEDURES.*?',
-                    r'CREW\s+PROCEDURE.*?',
-                    r'--+',
-                    r'BAR\s+CODE.*?',
-                    r'A/C\s+Registration.*?',
-                    r'Defect\s+Found.*?',
-                    r'Moc\s+No.*?',
-                    r'Open\s+Description.*?',
-                    r'Report.*?',
-                    r'Repetetive.*?'
-                ]
-                for p in noise_patterns:
-                    full_mel_text = re.sub(p, '', full_mel_text, flags=re.IGNORECASE)
-                
-                # Remove Registration patterns (usually 3 uppercase letters preceded by a number or space)
-                # Sample: "9 BGE", "CC-BGE", "97 BGF"
-                full_mel_text = re.sub(r'\b\d{1,3}\s+[A-Z]{3}\b', '', full_mel_text)
-                full_mel_text = re.sub(r'\bCC-[A-Z]{3}\b', '', full_mel_text)
-                
-                full_mel_text = re.sub(r'\s+', ' ', full_mel_text).strip()
-                
-                # Separation heuristic: Defect vs Description
-                # Try to find common status words like "INOP", "LIMIT", "RESTR", "FAIL"
-                status_split = re.split(r'\b(INOP|LIMIT|RESTR|FAIL|REQUIRED|ACTION)\b', full_mel_text, 1, flags=re.IGNORECASE)
-                
-                if len(status_split) > 1:
-                    defect = status_split[0].strip()
-                    description = (status_split[1] + status_split[2]).strip()
-                else:
-                    # If no obvious split word, use first 4 words as defect
-                    words = full_mel_text.split()
-                    if len(words) > 4:
-                        defect = " ".join(words[:4])
-                        description = " ".join(words[4:])
-                    else:
-                        defect = full_mel_text
-                        description = ""
-
-                if not any(item['number'] == num for item in self.summary['mel_items']):
-                    self.summary['mel_items'].append({
-                        'number': num,
-                        'level': lvl,
-                        'defect': defect,
-                        'description': description
-                    })
-
-    def _extract_notams_advanced(self, full_text):
-        # High-impact operational NOTAMs only
-        crit_patterns = [
-            r'RWY.*?CLOSED',
-            r'ILS.*?RWY.*?U/S',
-            r'ILS.*?U/S',
-            r'LOC.*?U/S',
-            r'GP.*?U/S',
-            r'CURFEW',
-            r'NOT\s+AVBL\s+FOR\s+DEPARTURE',
-            r'NORTH\s+END\s+CLOSED',
-            r'SOUTH\s+END\s+CLOSED',
-            r'SISTEMAS\s+INOP'
-        ]
+    def _extract_mel_advanced(self, text, page=None):
+        # Deferred items, see mel_parser; items can continue on the next page
+        if self.mel is None:
+            self.mel = MelParser()
+        self.summary['mel_items'] = self.mel.feed(text, page)
 
-        lines = full_text.split('\n')
-        found_notams = []
-        current_apt = "UNKNOWN"
-
-        for i in range(len(lines)):
-            line = lines[i].strip()
-            l_up = line.upper()
-            
-            # Detect airport header (e.g., "SCEL -SCL - SANTIAGO INTL")
-            apt_match = re.match(r'^([A-Z]{4})\s+-\s*([A-Z]{3})?\s*-', l_up)
-            if apt_match:
-                current_apt = apt_match.group(1)
-
-            if any(re.search(p, l_up) for p in crit_patterns):
-                # Capture just the matching line and the one after for concise context
-                context = lines[i:min(len(lines), i+2)]
-                notam_text = " ".join([c.strip() for c in context]).strip()
-                notam_text = re.sub(r'\s+', ' ', notam_text)
-                
-                # Deduplicate and filter out obvious noisy strings
-                if notam_text and len(notam_text) > 10:
-                    # Final check: skip if it's just about TWY or secondary lights unless it mentions RWY CLOSED
-                    if 'TWY' in notam_text.upper() and 'RWY' not in notam_text.upper() and 'CLOSED' not in notam_text.upper():
-                        continue
-                    
-                    # Prefix with current airport
-                    full_entry = f"{current_apt}: {notam_text}"
-                    if full_entry not in found_notams:
-                        found_notams.append(full_entry)
-
-        self.summary['notams_criticos'] = found_notams
+    def _extract_notams_advanced(self, full_text, current_apt="UNKNOWN"):
+        # High-impact operational NOTAMs only, see notam_rules.DEFAULT_RULES
+        hits = self.notam_rules.scan(full_text, current_apt, check=self._check_budget)
+        self.summary['notams_criticos'] = [f"{hit.airport}: {hit.text}" for hit in hits]
+        self.summary['notams_detalle'] = [
+            {
+                'airport': hit.airport,
+                'rule': hit.rule_id,
+                'page': hit.page,
+                'lines': [hit.line_start, hit.line_end],
+                'text': hit.text
+            }
+            for hit in hits
+        ]
 
     def _extract_turbulence(self, full_text):
-        # Anchor-based Navigation Log Parser
-        lines = full_text.split('\n')
-        max_turb = 0
-        max_loc = "N/A"
-        max_time = "N/A"
-        repeated = {} 
-        
-        last_posn = "N/A"
-        
-        for i in range(len(lines)):
-            line = lines[i].strip()
-            if not line: continue
-            
-            # Position identification: Starts with word (not coordinate)
-            posn_match = re.match(r'^([A-Z0-9]{3,7})\b', line)
-            # Avoid coordinate-like start and headers
-            if posn_match and not re.match(r'^[SN]\d{4}', line) and \
-               not any(x in line for x in ["PAGE", "LATAM", "RELEASE", "FREQ", "COORD", "POSN", "POS"]):
-                last_posn = posn_match.group(1)
-            
-            # Data line starts with coordinate
-            if re.match(r'^[SN]\d{4}', line):
-                wind_match = re.search(r'\b(\d{3}/\d{3})\b', line)
-                if wind_match:
-                    parts = line.split()
-                    try:
-                        # Find wind index
-                        wind_idx = -1
-                        for idx, p in enumerate(parts):
-                            if p == wind_match.group(1):
-                                wind_idx = idx
-                                break
-                        
-                        if wind_idx != -1 and len(parts) > wind_idx + 1:
-                            wsr_str = parts[wind_idx + 1]
-                            if wsr_str.isdigit():
-                                wsr = int(wsr_str)
-                                
-                                # ACT (Time) is 3 positions after WSR (DTGO, ACBOF, ACT)
-                                time_val = "N/A"
-                                if len(parts) > wind_idx + 4:
-                                    act = parts[wind_idx + 4]
-                                    if len(act) == 4 and act.isdigit():
-                                        time_val = f"{act[:2]}:{act[2:]}"
-                                
-                                if wsr > max_turb:
-                                    max_turb = wsr
-                                    max_loc = last_posn
-                                    max_time = time_val
-                                
-                                # Report all turbulences above 06 as requested
-                                if wsr >= 6:
-                                    t_str = str(wsr)
-                                    if t_str not in repeated:
-                                        repeated[t_str] = []
-                                    entry = {
-                                        'grado': wsr,
-                                        'punto': last_posn,
-                                        'eet': time_val
-                                    }
-                                    if not any(e['punto'] == last_posn and e['grado'] == wsr for e in repeated[t_str]):
-                                        repeated[t_str].append(entry)
-                    except (ValueError, IndexError):
-                        continue
-
-        self.summary['turbulencia_max'] = f"{max_turb:02d}"
-        self.summary['turbulencia_loc'] = f"{max_loc} ({max_time})"
-        self.summary['turbulencias_repetidas'] = repeated
+        # Nav log as a table (see navlog.parse_navlog); turbulence is derived from it.
+        # Imported here so pandas only loads once a nav log is parsed.
+        from navlog import parse_navlog, turbulence_summary
+        self.navlog = parse_navlog(full_text, self._check_budget)
+        (self.summary['turbulencia_max'], self.summary['turbulencia_loc'],
+         self.summary['turbulencias_repetidas']) = turbulence_summary(self.navlog)
 
     def _extract_weights_advanced(self, full_text):
         weights_found = []
@@ -330,26 +910,87 @@ class HighPrecisionPDFExtractor:
             self.summary['limitacion_margen'] = critical['margin']
             self.summary['limitacion_critica'] = critical['margin'] < 1000
 
-    def _extract_met_advanced(self, full_text):
-        sections = re.findall(r'([A-Z]{4})\s+-\s+.*?(?=([A-Z]{4}\s+-\s+|$))', full_text, re.DOTALL)
-        seen_airports = set()
-        for apt, next_lookahead in sections:
-            if apt in seen_airports or len(apt) != 4: continue
-            pattern = re.escape(apt) + r'\s+-.*?SA\s+\d{6}Z\s+(.*?)(?=[A-Z]{4}\s+-\s+|$)'
-            sa_match = re.search(pattern, full_text, re.DOTALL)
-            if sa_match:
-                metar_text = sa_match.group(1)
-                vis_match = re.search(r'\b(\d{4}|CAVOK)\b', metar_text)
-                if vis_match:
-                    vis = vis_match.group(1)
-                    vis_val = 9999 if vis == 'CAVOK' else int(vis)
-                    self.summary['meteorologia'].append({'airport': apt, 'visibility': vis_val, 'low_vis': vis_val < 2000})
-                    seen_airports.add(apt)
-
+    def _extract_met_advanced(self, full_text, weather=None):
+        # Visibility (plus wind, RVR and ceiling) from each airport's METAR
+        if weather is None:
+            weather = WeatherIndex(full_text, self._check_budget)
+        self.summary['meteorologia'] = weather.visibility_summary()
 
     def get_flight_summary(self):
+        if not self.complete and self.error is None:
+            self._extract_all()
         return self.summary
 
+
+SUMMARY_ROW_FIELDS = (
+    'vuelo', 'matricula', 'fecha', 'origen', 'destino', 'tiempo_vuelo', 'viento_arribo', 'pista_uso',
+    'limitacion_peso', 'limitacion_valor', 'limitacion_margen', 'limitacion_critica',
+    'turbulencia_max', 'turbulencia_loc', 'mel_items', 'notams_criticos',
+    'baja_visibilidad', 'tripulacion', 'incompletos',
+)
+
+
+def summary_row(summary):
+    # Flat one-line view of a summary for tables and CSV output
+    return {
+        'vuelo': summary['vuelo'],
+        'matricula': summary['matricula'],
+        'fecha': summary['fecha'],
+        'origen': summary['origen'],
+        'destino': summary['destino'],
+        'tiempo_vuelo': summary['tiempo_vuelo'],
+        'viento_arribo': summary['viento_arribo'],
+        'pista_uso': summary['pista_uso'],
+        'limitacion_peso': summary['limitacion_peso'],
+        'limitacion_valor': summary['limitacion_valor'],
+        'limitacion_margen': summary['limitacion_margen'],
+        'limitacion_critica': summary['limitacion_critica'],
+        'turbulencia_max': summary['turbulencia_max'],
+        'turbulencia_loc': summary['turbulencia_loc'],
+        'mel_items': len(summary['mel_items']),
+        'notams_criticos': len(summary['notams_criticos']),
+        'baja_visibilidad': " ".join(m['airport'] for m in summary['meteorologia'] if m['low_vis']),
+        'tripulacion': "; ".join(summary['tripulacion']),
+        'incompletos': " ".join(sorted(incomplete_fields(summary))),
+    }
+
+
+def options_signature(options):
+    # Only options that change the summary take part in the cache key
+    parts = []
+    if options.get('engine', 'auto') != 'auto':
+        parts.append(options['engine'])
+    rules = options.get('notam_rules')
+    if rules is not None:
+        if isinstance(rules, str):
+            rules = NotamRuleEngine.from_file(rules)
+        parts.append(repr(rules.rules))
+    if not parts:
+        return ""
+    return hashlib.sha256("|".join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+def extract_summary(pdf_path, cache=None, **options):
+    # Extraction through an optional ResultCache; repeat uploads of the same
+    # release skip parsing entirely
+    if cache is None:
+        return HighPrecisionPDFExtractor(pdf_path, **options).get_flight_summary()
+
+    data = normalize_source(pdf_path)
+    if not isinstance(data, bytes):
+        # Read once and parse from memory instead of opening the file twice
+        with open(data, 'rb') as f:
+            data = f.read()
+    key = cache.make_key(data, EXTRACTOR_VERSION, options_signature(options))
+    summary = cache.get(key)
+    if summary is None:
+        extractor = HighPrecisionPDFExtractor(data, **options)
+        summary = extractor.get_flight_summary()
+        # Degraded results are not cached, so the next upload tries again
+        if extractor.error is None and not extractor.incomplete_fields():
+            cache.put(key, summary)
+    return summary
+
 if __name__ == "__main__":
     # Test
     extractor = HighPrecisionPDFExtractor("muestra.pdf")
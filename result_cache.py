@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResultCache:
+    # Two tiers: an in-process LRU and an optional directory of JSON files.
+    # Entries are stored serialised so every hit hands out a fresh copy.
+    def __init__(self, max_entries=64, cache_dir=None, ttl=None, max_disk_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(data, version, signature=""):
+        # SHA-256 of the PDF bytes plus extractor version (and options, if any)
+        key = f"{content_digest(data)}-v{version}"
+        return f"{key}-{signature}" if signature else key
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                stored_at, payload = entry
+                if self._expired(stored_at, now):
+                    del self._memory[key]
+                else:
+                    self._memory.move_to_end(key)
+                    return json.loads(payload)
+
+        entry = self._disk_get(key, now)
+        if entry is None:
+            return None
+        # Promoted with its original write time, so the TTL still runs from insertion
+        stored_at, payload = entry
+        self._memory_put(key, payload, stored_at)
+        return json.loads(payload)
+
+    def put(self, key, summary):
+        payload = json.dumps(summary, ensure_ascii=False)
+        now = time.time()
+        self._memory_put(key, payload, now)
+        self._disk_put(key, payload)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self.cache_dir:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+    def __len__(self):
+        return len(self._memory)
+
+    def _expired(self, stored_at, now):
+        return self.ttl is not None and now - stored_at > self.ttl
+
+    def _memory_put(self, key, payload, now):
+        with self._lock:
+            self._memory[key] = (now, payload)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_get(self, key, now):
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            mtime = os.path.getmtime(path)
+            if self._expired(mtime, now):
+                os.remove(path)
+                return None
+            with open(path, encoding='utf-8') as f:
+                payload = f.read()
+            # The mtime is left alone: it is the write time the TTL is measured from
+            return mtime, payload
+        except OSError:
+            return None
+
+    def _disk_put(self, key, payload):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        now = time.time()
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if self._expired(st.st_mtime, now):
+                _remove_quietly(path)
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        # Oldest writes go first
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_disk_bytes:
+                break
+            _remove_quietly(path)
+            total -= size
+
+
+def _remove_quietly(path):
+    # Another process sharing the directory may have evicted it already
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# A fully extracted release: per-page content hashes, the summary and, per
+# stage, the (page number, hash) pairs its parser read
+Revision = namedtuple('Revision', ['digest', 'engine', 'page_hashes', 'summary', 'signatures', 'added'])
+
+# Share of pages a new PDF must have in common with a stored revision to be
+# treated as a re-release of it
+MIN_SHARED_PAGES = 0.5
+
+
+class RevisionStore:
+    # In-process store of recent revisions and the text of their pages, keyed
+    # by page content hash. A revised release only re-extracts the pages it
+    # does not share with an earlier revision, and only the stages whose
+    # pages changed run again.
+    def __init__(self, max_revisions=32):
+        self.max_revisions = max_revisions
+        self._revisions = OrderedDict()  # digest -> Revision, oldest first
+        self._page_text = {}  # (page hash, engine option) -> (text, page engine)
+        self._page_labels = {}  # page hash -> classifier labels
+        self._lock = threading.Lock()
+
+    def page(self, page_hash, engine):
+        with self._lock:
+            return self._page_text.get((page_hash, engine))
+
+    def labels(self, page_hash):
+        with self._lock:
+            labels = self._page_labels.get(page_hash)
+            return list(labels) if labels is not None else None
+
+    def best_match(self, page_hashes, engine):
+        # Stored revision sharing the most pages with page_hashes, if any
+        # shares at least MIN_SHARED_PAGES of them
+        wanted = set(page_hashes)
+        best, best_shared = None, 0
+        with self._lock:
+            for revision in self._revisions.values():
+                if revision.engine != engine:
+                    continue
+                shared = len(wanted.intersection(revision.page_hashes))
+                if shared > best_shared:
+                    best, best_shared = revision, shared
+        if best is None or best_shared < MIN_SHARED_PAGES * len(wanted):
+            return None
+        return best
+
+    def add(self, digest, engine, page_hashes, labels, pages, summary, signatures):
+        # pages: PageText for the pages read in this run (others may already be stored)
+        revision = Revision(digest, engine, list(page_hashes), json.loads(json.dumps(summary)),
+                            signatures, time.time())
+        with self._lock:
+            for page_hash, page_labels in zip(page_hashes, labels):
+                self._page_labels[page_hash] = list(page_labels)
+            for page in pages:
+                self._page_text[(page_hashes[page.number - 1], engine)] = (page.text, page.engine)
+            self._revisions.pop(digest, None)
+            self._revisions[digest] = revision
+            while len(self._revisions) > self.max_revisions:
+                self._revisions.popitem(last=False)
+                self._drop_unreferenced()
+        return revision
+
+    def __len__(self):
+        return len(self._revisions)
+
+    def _drop_unreferenced(self):
+        referenced = {page_hash for revision in self._revisions.values() for page_hash in revision.page_hashes}
+        for key in [key for key in self._page_text if key[0] not in referenced]:
+            del self._page_text[key]
+        for page_hash in [h for h in self._page_labels if h not in referenced]:
+            del self._page_labels[page_hash]
+
+
+def summary_diff(old, new):
+    # What a dispatcher needs to see between two revisions of a release
+    changes = {
+        'campos_modificados': [field for field in new if old.get(field) != new[field]],
+    }
+    weight_fields = ('limitacion_peso', 'limitacion_valor', 'limitacion_margen', 'limitacion_critica')
+    if any(old.get(field) != new[field] for field in weight_fields):
+        changes['limitacion'] = {
+            'antes': {field: old.get(field) for field in weight_fields},
+            'ahora': {field: new[field] for field in weight_fields},
+        }
+    old_notams, new_notams = set(old.get('notams_criticos', [])), set(new['notams_criticos'])
+    changes['notams_nuevos'] = [notam for notam in new['notams_criticos'] if notam not in old_notams]
+    changes['notams_retirados'] = [notam for notam in old.get('notams_criticos', []) if notam not in new_notams]
+    old_mel = {item['number']: item for item in old.get('mel_items', [])}
+    new_mel = {item['number']: item for item in new['mel_items']}
+    changes['mel_agregados'] = [item for number, item in new_mel.items() if number not in old_mel]
+    changes['mel_retirados'] = [item for number, item in old_mel.items() if number not in new_mel]
+    return changes
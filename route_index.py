@@ -0,0 +1,70 @@
+import re
+
+from weather_parser import LOW_VIS_LIMIT, format_wind
+
+# One scan of the release text for both kinds of route information:
+#   route string tokens, airport + runway: "SCELR17L DCT DOKIR ... YSSYR16L"
+#   release lines naming the airports: "ORIG SCEL", "DEST YSSY 82909 1351", "ALTN YSCB 4500 0045"
+_ROUTE_MARKERS = re.compile(
+    r'\b(?P<role>ORIG|DEST|ALTN)\s+(?P<role_icao>[A-Z]{4})\b'
+    r'|\b(?P<icao>[A-Z]{4})R(?P<runway>\d{2}[LRC]?)\b')
+
+
+class RouteIndex:
+    # Origin, destination and alternates of the release, with each airport's
+    # runway from the route string and its weather from a WeatherIndex.
+    # Built in one pass; lookups do not depend on how many airports the
+    # package lists.
+    def __init__(self, text, weather=None, origin=None, destination=None):
+        self.weather = weather
+        self.origin = origin
+        self.destination = destination
+        self.alternates = []
+        self.runways = {}  # icao -> first runway in the route string
+        self._build(text)
+
+    def _build(self, text):
+        origin = destination = None
+        for match in _ROUTE_MARKERS.finditer(text):
+            if match.lastgroup == 'runway':
+                self.runways.setdefault(match.group('icao'), match.group('runway'))
+                continue
+            icao = match.group('role_icao')
+            role = match.group('role')
+            if role == 'ORIG':
+                origin = origin or icao
+            elif role == 'DEST':
+                destination = destination or icao
+            elif icao not in self.alternates:
+                self.alternates.append(icao)
+        # Airports already known (from the flight summary line) take precedence
+        self.origin = self.origin or origin
+        self.destination = self.destination or destination
+
+    def runway(self, airport):
+        return self.runways.get(airport)
+
+    def wind(self, airport):
+        if self.weather is None or airport is None:
+            return None
+        return self.weather.wind(airport)
+
+    def conditions(self, airport):
+        # Runway, wind and visibility for one airport; the METAR is used when
+        # there is one, the TAF otherwise
+        report = None
+        if self.weather is not None:
+            report = self.weather.metar(airport) or self.weather.taf(airport)
+        visibility = report.visibility if report is not None else None
+        return {
+            'airport': airport,
+            'runway': self.runway(airport),
+            'wind': format_wind(self.wind(airport)),
+            'visibility': visibility,
+            'low_vis': visibility is not None and visibility < LOW_VIS_LIMIT,
+            'ceiling': report.ceiling if report is not None else None,
+            'source': report.kind if report is not None else None,
+        }
+
+    def alternates_conditions(self):
+        return [self.conditions(airport) for airport in self.alternates]
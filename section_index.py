@@ -0,0 +1,78 @@
+import re
+from bisect import bisect_right
+
+# One combined scan tags every page with the sections it contains.
+# Alternatives mirror what each parser looks for in its own slice.
+_SECTION_MARKERS = re.compile(
+    r'(?P<page>^--- PAGE (?P<page_num>\d+) ---$)'
+    r'|(?P<airport>^[ \t]*(?P<icao>[A-Z]{4})[ \t]+-[ \t]*(?:[A-Z]{3})?[ \t]*-)'
+    r'|(?P<navlog>^[ \t]*[SN]\d{4}[^\n]*?\b\d{3}/\d{3}\b)'
+    r'|(?P<weights>\b[EM](?:ZFW|TOW|LDW)\b)'
+    r'|(?P<mel>DEFERRED ITEM LIST|Operational Limitations Report)'
+    r'|(?P<notam>NOTAM)'
+    r'|(?P<release>\bDEST\s+[A-Z]{4}|\bFlight\s|Acft\.\s+Regist|[A-Z]{4}R\d{2}[LRC])',
+    re.MULTILINE)
+
+PAGE_SECTIONS = ('navlog', 'weights', 'mel', 'notam', 'release')
+
+
+class SectionIndex:
+    def __init__(self, full_text):
+        self.full_text = full_text
+        self.pages = []  # (page number, start, end)
+        self.page_sections = {name: [] for name in PAGE_SECTIONS}
+        self.airports = []  # (icao, start, end)
+        self._build()
+
+    def _build(self):
+        text = self.full_text
+        tagged = set()
+        airport_starts = []
+        for match in _SECTION_MARKERS.finditer(text):
+            kind = match.lastgroup
+            if kind == 'page':
+                if self.pages:
+                    number, start, _ = self.pages[-1]
+                    self.pages[-1] = (number, start, match.start())
+                self.pages.append((int(match.group('page_num')), match.start(), len(text)))
+                tagged = set()
+            elif kind == 'airport':
+                airport_starts.append((match.group('icao'), match.start()))
+            elif kind not in tagged and self.pages:
+                tagged.add(kind)
+                self.page_sections[kind].append(len(self.pages) - 1)
+
+        for i, (icao, start) in enumerate(airport_starts):
+            end = airport_starts[i + 1][1] if i + 1 < len(airport_starts) else len(text)
+            self.airports.append((icao, start, end))
+        self._airport_offsets = [start for _, start, _ in self.airports]
+
+    def spans(self, name):
+        # Offsets into full_text, contiguous pages merged into one span
+        if name == 'weather':
+            return [(start, end) for _, start, end in self.airports]
+        page_idx = self.page_sections[name]
+        if name == 'notam' and page_idx:
+            # NOTAM annexes run to the end of the package once they start
+            page_idx = range(page_idx[0], len(self.pages))
+        spans = []
+        for idx in page_idx:
+            _, start, end = self.pages[idx]
+            if spans and spans[-1][1] == start:
+                spans[-1] = (spans[-1][0], end)
+            else:
+                spans.append((start, end))
+        return spans
+
+    def text(self, name, fallback_to_full=False):
+        spans = self.spans(name)
+        if not spans:
+            return self.full_text if fallback_to_full else ""
+        if len(spans) == 1 and spans[0] == (0, len(self.full_text)):
+            return self.full_text
+        return "".join(self.full_text[start:end] for start, end in spans)
+
+    def airport_at(self, offset):
+        # Airport whose header block contains offset, if any
+        i = bisect_right(self._airport_offsets, offset) - 1
+        return self.airports[i][0] if i >= 0 else None
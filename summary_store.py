@@ -0,0 +1,344 @@
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+# Bump when the tables change, and add the step that upgrades the previous
+# version to MIGRATIONS: MIGRATIONS[n] is the SQL taking a version n
+# database to n + 1. A database with no upgrade path is never rebuilt,
+# opening it raises StoreVersionError.
+SCHEMA_VERSION = 1
+MIGRATIONS = {}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flights (
+    id INTEGER PRIMARY KEY,
+    digest TEXT UNIQUE,
+    source TEXT,
+    flight TEXT,
+    registration TEXT,
+    flight_date TEXT,
+    origin TEXT,
+    destination TEXT,
+    flight_minutes INTEGER,
+    limiting_weight TEXT,
+    weight_margin INTEGER,
+    weight_critical INTEGER,
+    max_turbulence INTEGER,
+    stored_at REAL
+);
+-- Full summary JSON, kept out of flights so aggregate scans stay small
+CREATE TABLE IF NOT EXISTS flight_summaries (
+    flight_id INTEGER PRIMARY KEY REFERENCES flights(id) ON DELETE CASCADE,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS mel_items (
+    flight_id INTEGER NOT NULL REFERENCES flights(id) ON DELETE CASCADE,
+    number TEXT,
+    level TEXT,
+    defect TEXT,
+    description TEXT
+);
+CREATE TABLE IF NOT EXISTS turbulence_points (
+    flight_id INTEGER NOT NULL REFERENCES flights(id) ON DELETE CASCADE,
+    waypoint TEXT,
+    grade INTEGER,
+    eet TEXT
+);
+CREATE TABLE IF NOT EXISTS metar_observations (
+    flight_id INTEGER NOT NULL REFERENCES flights(id) ON DELETE CASCADE,
+    airport TEXT,
+    time TEXT,
+    visibility INTEGER,
+    low_vis INTEGER,
+    wind TEXT,
+    rvr INTEGER,
+    ceiling INTEGER
+);
+CREATE TABLE IF NOT EXISTS notam_hits (
+    flight_id INTEGER NOT NULL REFERENCES flights(id) ON DELETE CASCADE,
+    airport TEXT,
+    rule TEXT,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS flights_flight ON flights(flight);
+CREATE INDEX IF NOT EXISTS flights_registration ON flights(registration, flight_date);
+CREATE INDEX IF NOT EXISTS flights_date ON flights(flight_date);
+CREATE INDEX IF NOT EXISTS flights_route ON flights(origin, destination);
+CREATE INDEX IF NOT EXISTS mel_items_flight ON mel_items(flight_id);
+CREATE INDEX IF NOT EXISTS mel_items_number ON mel_items(number, flight_id);
+CREATE INDEX IF NOT EXISTS turbulence_points_flight ON turbulence_points(flight_id);
+CREATE INDEX IF NOT EXISTS turbulence_points_waypoint ON turbulence_points(waypoint, grade, flight_id);
+CREATE INDEX IF NOT EXISTS metar_observations_flight ON metar_observations(flight_id);
+CREATE INDEX IF NOT EXISTS metar_observations_airport ON metar_observations(airport);
+CREATE INDEX IF NOT EXISTS notam_hits_flight ON notam_hits(flight_id);
+CREATE INDEX IF NOT EXISTS notam_hits_airport ON notam_hits(airport, rule, flight_id);
+"""
+
+FLIGHT_TIME = re.compile(r'(\d+)h\s*(\d+)m')
+# "WP009 (01:03)"
+TURBULENCE_LOC = re.compile(r'(\S+)\s+\((.*)\)')
+
+
+def _value(value):
+    # The summary uses "N/A" for fields it did not find
+    return None if value in ('N/A', '') else value
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def flight_row(summary, source=None, digest=None):
+    time_match = FLIGHT_TIME.match(summary.get('tiempo_vuelo', ''))
+    return (
+        digest, source,
+        _value(summary['vuelo']), _value(summary['matricula']), _value(summary.get('fecha')),
+        _value(summary.get('origen')), _value(summary.get('destino')),
+        int(time_match.group(1)) * 60 + int(time_match.group(2)) if time_match else None,
+        _value(summary['limitacion_peso']),
+        _int(summary['limitacion_margen']) if summary['limitacion_peso'] != 'N/A' else None,
+        int(bool(summary['limitacion_critica'])),
+        _int(summary['turbulencia_max']),
+        time.time(),
+    )
+
+
+def turbulence_rows(summary):
+    # Every waypoint the summary reports, once per grade: the maximum plus
+    # the severe and repeated (06 and above) points
+    points = {}
+    loc = TURBULENCE_LOC.match(summary['turbulencia_loc'])
+    grade = _int(summary['turbulencia_max'])
+    if loc and grade:
+        points[(loc.group(1), grade)] = _value(loc.group(2))
+    for point in summary['turbulencias_severas'] + [p for pts in summary['turbulencias_repetidas'].values() for p in pts]:
+        points.setdefault((point['punto'], point['grado']), _value(point['eet']))
+    return [(waypoint, grade, eet) for (waypoint, grade), eet in points.items()]
+
+
+class StoreVersionError(RuntimeError):
+    pass
+
+
+class SummaryStore:
+    # SQLite history of extracted summaries, one row per release in flights
+    # and its MEL items, turbulence points, METARs and NOTAM hits in their
+    # own tables, so fleet-wide questions are indexed queries instead of
+    # re-parsing PDFs. Storing the same release (digest) again replaces it.
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        # Child rows go with their flight when a release is stored again
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.execute("PRAGMA synchronous = NORMAL")
+        # GROUP BY and DISTINCT sort in temporary b-trees; keep them off disk
+        self._conn.execute("PRAGMA temp_store = MEMORY")
+        try:
+            self._open_schema()
+        except Exception:
+            self._conn.close()
+            raise
+
+    def _open_schema(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        tables = self._conn.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0]
+        if version == 0 and tables:
+            raise StoreVersionError(f"{self.path} is not a summary store")
+        if version > SCHEMA_VERSION:
+            raise StoreVersionError(
+                f"{self.path} uses summary store schema {version}, newer than this version ({SCHEMA_VERSION})")
+        if version and any(step not in MIGRATIONS for step in range(version, SCHEMA_VERSION)):
+            raise StoreVersionError(
+                f"{self.path} uses summary store schema {version} and cannot be upgraded to {SCHEMA_VERSION}")
+        with self._conn:
+            # A new file (version 0) gets the current schema directly
+            if version:
+                for step in range(version, SCHEMA_VERSION):
+                    self._conn.executescript(MIGRATIONS[step])
+            self._conn.executescript(SCHEMA)
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def add(self, summary, source=None, digest=None):
+        return self.add_many([(summary, source, digest)])[0]
+
+    def add_many(self, records):
+        # records: (summary, source, digest) tuples, stored in one transaction.
+        # A release listed twice is stored once, from its last copy.
+        records = list({
+            digest if digest is not None else i: (summary, source, digest)
+            for i, (summary, source, digest) in enumerate(records)
+        }.values())
+        ids = []
+        summaries, mel, turbulence, metars, notams = [], [], [], [], []
+        with self._lock, self._conn:
+            for summary, source, digest in records:
+                if digest is not None:
+                    self._conn.execute("DELETE FROM flights WHERE digest = ?", (digest,))
+                cursor = self._conn.execute(
+                    "INSERT INTO flights (digest, source, flight, registration, flight_date, origin, destination, "
+                    "flight_minutes, limiting_weight, weight_margin, weight_critical, max_turbulence, stored_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    flight_row(summary, source, digest))
+                flight_id = cursor.lastrowid
+                ids.append(flight_id)
+                summaries.append((flight_id, json.dumps(summary, ensure_ascii=False)))
+                mel += [(flight_id, item['number'], item['level'], item.get('defect'), item.get('description'))
+                        for item in summary['mel_items']]
+                turbulence += [(flight_id,) + row for row in turbulence_rows(summary)]
+                metars += [(flight_id, m['airport'], m.get('time'), m['visibility'], int(m['low_vis']),
+                            m.get('wind'), m.get('rvr'), m.get('ceiling'))
+                           for m in summary['meteorologia']]
+                notams += [(flight_id, n['airport'], n['rule'], n['text']) for n in summary.get('notams_detalle', [])]
+            self._conn.executemany("INSERT INTO flight_summaries VALUES (?, ?)", summaries)
+            self._conn.executemany("INSERT INTO mel_items VALUES (?, ?, ?, ?, ?)", mel)
+            self._conn.executemany("INSERT INTO turbulence_points VALUES (?, ?, ?, ?)", turbulence)
+            self._conn.executemany("INSERT INTO metar_observations VALUES (?, ?, ?, ?, ?, ?, ?, ?)", metars)
+            self._conn.executemany("INSERT INTO notam_hits VALUES (?, ?, ?, ?)", notams)
+        return ids
+
+    def summary(self, flight_id):
+        rows = self._query("SELECT summary FROM flight_summaries WHERE flight_id = ?", (flight_id,))
+        return json.loads(rows[0]['summary']) if rows else None
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) AS n FROM flights")[0]['n']
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    @staticmethod
+    def _flight_filters(origin=None, destination=None, since=None, until=None, registration=None):
+        # WHERE clauses on the flights table (aliased f) and their parameters
+        clauses, params = [], []
+        for column, op, value in (('origin', '=', origin), ('destination', '=', destination),
+                                  ('flight_date', '>=', since), ('flight_date', '<=', until),
+                                  ('registration', '=', registration)):
+            if value is not None:
+                clauses.append(f"f.{column} {op} ?")
+                params.append(value)
+        return clauses, params
+
+    def turbulence_hotspots(self, min_grade=6, min_flights=2, **filters):
+        # Waypoints reported at min_grade or above on at least min_flights flights
+        clauses, params = self._flight_filters(**filters)
+        where = " AND ".join(["t.grade >= ?"] + clauses)
+        return self._query(
+            "SELECT t.waypoint, COUNT(DISTINCT t.flight_id) AS flights, MAX(t.grade) AS max_grade, "
+            "MIN(f.flight_date) AS first_seen, MAX(f.flight_date) AS last_seen "
+            f"FROM turbulence_points t JOIN flights f ON f.id = t.flight_id WHERE {where} "
+            "GROUP BY t.waypoint HAVING flights >= ? ORDER BY flights DESC, max_grade DESC, t.waypoint",
+            [min_grade] + params + [min_flights])
+
+    def persistent_mel(self, min_days=14, **filters):
+        # MEL items a registration has carried for at least min_days
+        # (between the first and last release that lists them)
+        clauses, params = self._flight_filters(**filters)
+        where = " AND ".join(["f.flight_date IS NOT NULL", "f.registration IS NOT NULL"] + clauses)
+        return self._query(
+            "SELECT f.registration, m.number, MAX(m.level) AS level, MAX(m.defect) AS defect, "
+            "COUNT(DISTINCT f.id) AS flights, MIN(f.flight_date) AS first_seen, MAX(f.flight_date) AS last_seen, "
+            "CAST(julianday(MAX(f.flight_date)) - julianday(MIN(f.flight_date)) AS INTEGER) AS days "
+            f"FROM mel_items m JOIN flights f ON f.id = m.flight_id WHERE {where} "
+            "GROUP BY f.registration, m.number HAVING days >= ? ORDER BY days DESC, f.registration, m.number",
+            params + [min_days])
+
+    def limiting_weights(self, **filters):
+        # How often each weight (ZFW, TOW, LDW) is the most restrictive one
+        clauses, params = self._flight_filters(**filters)
+        where = " AND ".join(["f.limiting_weight IS NOT NULL"] + clauses)
+        return self._query(
+            "SELECT f.limiting_weight, COUNT(*) AS flights, "
+            "ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER (), 1) AS percent, "
+            "SUM(f.weight_critical) AS critical, MIN(f.weight_margin) AS min_margin "
+            f"FROM flights f WHERE {where} GROUP BY f.limiting_weight ORDER BY flights DESC",
+            params)
+
+    def low_visibility(self, **filters):
+        # Low-visibility observations per airport
+        join, where, params = self._join_flights('o', filters)
+        return self._query(
+            "SELECT o.airport, COUNT(*) AS observations, SUM(o.low_vis) AS low_vis, MIN(o.visibility) AS min_visibility "
+            f"FROM metar_observations o {join} {where} "
+            "GROUP BY o.airport ORDER BY low_vis DESC, o.airport",
+            params)
+
+    def notam_rules(self, **filters):
+        # Critical NOTAM hits per airport and rule
+        join, where, params = self._join_flights('n', filters)
+        return self._query(
+            "SELECT n.airport, n.rule, COUNT(*) AS hits, COUNT(DISTINCT n.flight_id) AS flights "
+            f"FROM notam_hits n {join} {where} "
+            "GROUP BY n.airport, n.rule ORDER BY hits DESC, n.airport, n.rule",
+            params)
+
+    def _join_flights(self, alias, filters):
+        # Child-table aggregates only join flights when a filter needs it
+        clauses, params = self._flight_filters(**filters)
+        if not clauses:
+            return "", "", params
+        return f"JOIN flights f ON f.id = {alias}.flight_id", "WHERE " + " AND ".join(clauses), params
+
+
+QUERIES = {
+    'turbulence': 'turbulence_hotspots',
+    'mel': 'persistent_mel',
+    'weights': 'limiting_weights',
+    'visibility': 'low_visibility',
+    'notams': 'notam_rules',
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the history of extracted flight summaries.")
+    parser.add_argument('database', help="SQLite file written by batch_extract.py --store")
+    parser.add_argument('query', choices=sorted(QUERIES))
+    parser.add_argument('--origin')
+    parser.add_argument('--destination')
+    parser.add_argument('--registration')
+    parser.add_argument('--since', help="first flight date, YYYY-MM-DD")
+    parser.add_argument('--until', help="last flight date, YYYY-MM-DD")
+    parser.add_argument('--min-grade', type=int, help="turbulence: lowest WSR grade (default 6)")
+    parser.add_argument('--min-flights', type=int, help="turbulence: flights a waypoint must appear on (default 2)")
+    parser.add_argument('--min-days', type=int, help="mel: days an item must stay open (default 14)")
+    args = parser.parse_args(argv)
+
+    options = {name: getattr(args, name) for name in ('origin', 'destination', 'registration', 'since', 'until')}
+    if args.query == 'turbulence':
+        options.update(min_grade=6 if args.min_grade is None else args.min_grade,
+                       min_flights=2 if args.min_flights is None else args.min_flights)
+    elif args.query == 'mel':
+        options.update(min_days=args.min_days if args.min_days is not None else 14)
+    with SummaryStore(args.database) as store:
+        start = time.perf_counter()
+        rows = getattr(store, QUERIES[args.query])(**options)
+        elapsed = time.perf_counter() - start
+        for row in rows:
+            print(json.dumps(row, ensure_ascii=False))
+        print(f"{len(rows)} rows from {len(store)} flights in {elapsed * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import argparse
+import random
+
+import pymupdf
+
+# Synthetic LATAM-style dispatch packages for benchmarking. Everything here
+# is made up: no real crew names, registrations or operational data.
+
+FIRST_NAMES = ["JUAN", "MARIA", "PEDRO", "ANA", "DIEGO", "CAROLINA", "JAVIER", "PAULA"]
+LAST_NAMES = ["PEREZ", "GONZALEZ", "ROJAS", "DIAZ", "SOTO", "MUNOZ", "VARGAS", "LARA"]
+AIRPORTS = [
+    ("SCEL", "SCL", "SANTIAGO INTL"),
+    ("YSSY", "SYD", "SYDNEY K.SMITH."),
+    ("YMML", "MEL", "MELBOURNE INTL"),
+    ("NZAA", "AKL", "AUCKLAND INTL"),
+    ("YSCB", "CBR", "CANBERRA"),
+    ("SCIP", "IPC", "MATAVERI INTL"),
+]
+MEL_DEFECTS = [
+    ("34-11-01", "C", "WEATHER RADAR INOP LEFT SYSTEM"),
+    ("21-31-02", "B", "PACK VALVE FAIL POSITION LIMIT FL350"),
+    ("30-42-01", "C", "WINDSHIELD HEAT RESTR ONE PANE"),
+    ("49-10-03", "A", "APU GENERATOR INOP REQUIRED GPU"),
+    ("23-51-04", "C", "CABIN INTERPHONE HANDSET FAIL AFT"),
+]
+NOTAM_TEMPLATES = [
+    "RWY {rwy} CLOSED DUE MAINT",
+    "ILS RWY {rwy} U/S",
+    "LOC RWY {rwy} U/S",
+    "TWY B LIGHTS U/S",
+    "AD CURFEW 1300-2000 EXC EMERG",
+    "APRON 3 STANDS 10-14 NOT AVBL",
+    "OBST CRANE 250FT AGL ERECTED",
+]
+LINES_PER_PAGE = 60
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def crew_page(rng):
+    lines = ["LATAM AIRLINES GROUP          CREW LIST", "Cockpit Crew"]
+    for pos in ("CMD", "CP", "FO", "FO"):
+        lines.append(f"{pos} {_name(rng)} {rng.randint(0, 99999999):08d}")
+    lines.append("Cabin Crew")
+    for pos in ("JS", "CC", "CC"):
+        lines.append(f"{pos} {_name(rng)} {rng.randint(0, 99999999):08d}")
+    return lines
+
+
+def release_page(rng, orig, dest, altn):
+    return [
+        "LATAM FLIGHT RELEASE",
+        "Flight LA809   Acft. Regist CC-BGE",
+        f"ORIG {orig[0]}",
+        f"DEST {dest[0]} 82909 {rng.randint(10, 15):02d}{rng.randint(0, 59):02d}",
+        f"ALTN {altn[0]} 4500 0045",
+        f"EZFW {180000 + rng.randint(0, 900)} MZFW 181000",
+        f"ETOW {250000 + rng.randint(0, 3000)} MTOW 254000",
+        f"ELDW {185000 + rng.randint(0, 5000)} MLDW 192000",
+    ]
+
+
+def flight_line_page(orig, dest):
+    return [
+        "FLIGHT PLAN SUMMARY",
+        f"LAN809 02FEB26 CCBGE LA789 {orig[0]} 0425 {dest[0]} 1915",
+        f"{orig[0]}R17L DCT DOKIR UL302 RIVET DCT {dest[0]}R16L",
+    ]
+
+
+def navlog_page(rng, start_wp):
+    lines = ["NAVIGATION LOG", "POSN COORD FREQ WIND WSR DTGO ACBOF ACT REM MIN"]
+    for k in range((LINES_PER_PAGE - 2) // 2):
+        wp = f"WP{start_wp + k:03d}"
+        act = (start_wp + k) * 7
+        lines.append(wp)
+        lines.append(
+            f"S{rng.randint(3000, 4500)}.{rng.randint(0, 9)}W{rng.randint(7000, 17999):05d}.{rng.randint(0, 9)} "
+            f"M{rng.randint(40, 60)} {rng.randint(0, 359):03d}/{rng.randint(5, 150):03d} {rng.randint(1, 9):02d} "
+            f"{rng.randint(100, 999)} {rng.randint(10, 99)}.{rng.randint(0, 9)} {act // 60 % 24:02d}{act % 60:02d} "
+            f"{rng.randint(20000, 90000)} {rng.randint(5000, 15000)}"
+        )
+    return lines
+
+
+def mel_page(rng):
+    lines = ["Operational Limitations Report", "DEFERRED ITEM LIST", "A/C Registration CC-BGE"]
+    for number, level, defect in rng.sample(MEL_DEFECTS, 3):
+        lines.append(f"{number} MEL {level} {rng.randint(1, 28):02d}/02/2026 MOC Nº {rng.randint(10000, 99999)}")
+        lines.append(defect)
+        lines.append("MAINTENANCE PROCEDURES APPLY")
+    return lines
+
+
+def weather_page(rng, airports):
+    lines = []
+    for icao, iata, name in airports:
+        vis = rng.choice(["9999", "CAVOK", "1500", "0800", "4000"])
+        rvr = " R16L/0600" if vis in ("1500", "0800") else ""
+        lines.append(f"{icao} -{iata} - {name}")
+        lines.append(f"SA 020100Z {rng.randint(0, 35) * 10:03d}{rng.randint(3, 35):02d}KT {vis}{rvr} "
+                     f"BKN0{rng.randint(3, 40):02d} {rng.randint(5, 25):02d}/{rng.randint(0, 15):02d} Q10{rng.randint(0, 30):02d}")
+        lines.append(f"FT 020000Z 0200/0306 {rng.randint(0, 35) * 10:03d}{rng.randint(3, 30):02d}KT 9999 SCT030")
+    return lines
+
+
+def notam_page(rng, airports):
+    lines = ["NOTAM"]
+    while len(lines) < LINES_PER_PAGE - 4:
+        icao, iata, name = rng.choice(airports)
+        lines.append(f"{icao} -{iata} - {name}")
+        for _ in range(rng.randint(2, 5)):
+            text = rng.choice(NOTAM_TEMPLATES).format(rwy=rng.choice(["16L/34R", "17L/35R", "07/25"]))
+            lines.append(f"A{rng.randint(1000, 9999)}/26 {text}")
+            lines.append(f"FROM 26020{rng.randint(1, 9)}0000 TO 26030{rng.randint(1, 9)}2359")
+    return lines
+
+
+def filler_page(number):
+    return [f"LATAM OPERATIONAL FLIGHT PLAN PAGE {number}", "INTENTIONALLY LEFT BLANK"]
+
+
+def page_layout(page_count):
+    # Package layout: crew, release, nav log, MEL, weather, some filler and
+    # NOTAMs filling the rest (as in real annexes); the clean flight line
+    # sits on page 13
+    kinds = ['crew', 'release']
+    kinds += ['navlog'] * max(1, page_count // 5)
+    kinds += ['mel'] * max(1, page_count // 50)
+    kinds += ['weather'] * max(1, page_count // 20)
+    while len(kinds) < page_count:
+        kinds.append('filler' if len(kinds) < page_count * 0.4 else 'notam')
+    if page_count >= 13:
+        kinds.insert(12, 'flight_line')
+    return kinds[:page_count]
+
+
+def build_pages(page_count, seed=0, route=None):
+    # route: (origin, destination, alternate) ICAO codes from AIRPORTS
+    rng = random.Random(seed)
+    airports = {airport[0]: airport for airport in AIRPORTS}
+    orig, dest, altn = (airports[icao] for icao in route or ('SCEL', 'YSSY', 'YSCB'))
+    pages = []
+    wp = 0
+    for number, kind in enumerate(page_layout(page_count), start=1):
+        if kind == 'crew':
+            lines = crew_page(rng)
+        elif kind == 'release':
+            lines = release_page(rng, orig, dest, altn)
+        elif kind == 'flight_line':
+            lines = flight_line_page(orig, dest)
+        elif kind == 'navlog':
+            lines = navlog_page(rng, wp)
+            wp += (LINES_PER_PAGE - 2) // 2
+        elif kind == 'mel':
+            lines = mel_page(rng)
+        elif kind == 'weather':
+            lines = weather_page(rng, AIRPORTS)
+        elif kind == 'notam':
+            lines = notam_page(rng, AIRPORTS)
+        else:
+            lines = filler_page(number)
+        pages.append(lines)
+    return pages
+
+
+def generate_release(page_count, seed=0, route=None):
+    # Returns the PDF as bytes
+    doc = pymupdf.open()
+    for lines in build_pages(page_count, seed, route):
+        page = doc.new_page()
+        for i, line in enumerate(lines):
+            page.insert_text((30, 30 + i * 12.5), line, fontname="cour", fontsize=7)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic dispatch package PDF.")
+    parser.add_argument('output')
+    parser.add_argument('-p', '--pages', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--route', nargs=3, metavar=('ORIG', 'DEST', 'ALTN'),
+                        choices=[airport[0] for airport in AIRPORTS], help="ICAO codes (default SCEL YSSY YSCB)")
+    args = parser.parse_args(argv)
+    with open(args.output, 'wb') as f:
+        f.write(generate_release(args.pages, args.seed, args.route))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from page_classifier import CLASSIFIER_VERSION
+from pdf_backends import PageText
+
+# Bump when the sidecar layout changes; older sidecars are ignored
+TEXT_LAYER_VERSION = 1
+SUFFIX = '.text.json.gz'
+
+# Every page text the parsers read from one PDF, with the page labels, so
+# the parsers can run again without the PDF. pages maps page index -> PageText.
+TextLayer = namedtuple('TextLayer', ['digest', 'engine', 'labels', 'pages', 'pdf_bytes'])
+
+
+class TextLayerStore:
+    # Directory of gzip JSON sidecars, one per PDF content digest and engine
+    # option. Extraction with a store writes the sidecar once; later runs
+    # (see HighPrecisionPDFExtractor.from_text_layer) read page texts from it
+    # instead of parsing the PDF again.
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, digest, engine):
+        return os.path.join(self.directory, f"{digest}-{engine}{SUFFIX}")
+
+    def get(self, digest, engine):
+        return self.load(self.path(digest, engine))
+
+    def load(self, path):
+        # None when missing, unreadable or written by an older layout/classifier
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != TEXT_LAYER_VERSION or data.get('classifier') != CLASSIFIER_VERSION:
+            return None
+        pages = {number - 1: PageText(number, text, engine) for number, text, engine in data['pages']}
+        return TextLayer(data['digest'], data['engine'], data['labels'], pages, data['pdf_bytes'])
+
+    def put(self, digest, engine, labels, pages, pdf_bytes):
+        payload = json.dumps({
+            'version': TEXT_LAYER_VERSION,
+            'classifier': CLASSIFIER_VERSION,
+            'digest': digest,
+            'engine': engine,
+            'pdf_bytes': pdf_bytes,
+            'labels': labels,
+            'pages': [[page.number, page.text, page.engine] for page in pages],
+        }, ensure_ascii=False, separators=(',', ':'))
+        path = self.path(digest, engine)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return path
+
+    def paths(self):
+        return sorted(os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                      if name.endswith(SUFFIX))
+
+    def __len__(self):
+        return len(self.paths())
+
+
+def reanalyse_file(path, notam_rules=None):
+    # Runs in a pool worker; never raises, like batch_extract.extract_file
+    from pdf_extractor import HighPrecisionPDFExtractor
+
+    start = time.perf_counter()
+    record = {'file': path, 'status': 'ok', 'error': None, 'pages': 0}
+    try:
+        layer = TextLayerStore(os.path.dirname(path) or '.').load(path)
+        if layer is None:
+            raise ValueError("unreadable or outdated text layer")
+        record['digest'] = layer.digest
+        extractor = HighPrecisionPDFExtractor.from_text_layer(layer, notam_rules=notam_rules)
+        record['pages'] = len(extractor.pages)
+        if extractor.error is not None:
+            record['status'] = 'error'
+            record['error'] = str(extractor.error)
+        else:
+            record['summary'] = extractor.get_flight_summary()
+            incomplete = extractor.incomplete_fields()
+            if incomplete:
+                record['status'] = 'partial'
+                record['error'] = ", ".join(f"{field}: {status}" for field, status in sorted(incomplete.items()))
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        record['seconds'] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def main(argv=None):
+    from batch_extract import STORE_BATCH, CsvWriter, JsonlWriter
+    from summary_store import SummaryStore
+
+    parser = argparse.ArgumentParser(
+        description="Re-run the parsers over stored text layers (see batch_extract.py --text-layer), "
+                    "without opening the PDFs.")
+    parser.add_argument('directory', help="text layer directory")
+    parser.add_argument('-o', '--output', help="output file (default: stdout)")
+    parser.add_argument('-f', '--format', choices=('jsonl', 'csv'), default='jsonl')
+    parser.add_argument('-w', '--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--notam-rules', default=None, help="JSON file with extra NOTAM rules")
+    parser.add_argument('--store', default=None, help="replace the stored summaries in this SQLite file")
+    args = parser.parse_args(argv)
+
+    paths = TextLayerStore(args.directory).paths()
+    if not paths:
+        print("No text layers found.", file=sys.stderr)
+        return 2
+
+    out = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    store = SummaryStore(args.store) if args.store else None
+    stats = {'files': 0, 'ok': 0, 'partial': 0, 'errors': 0, 'pages': 0, 'stored': 0}
+    to_store = []
+    start = time.perf_counter()
+    try:
+        writer = CsvWriter(out) if args.format == 'csv' else JsonlWriter(out)
+        workers = args.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Each layer takes milliseconds, so hand them out in chunks
+            chunk = max(1, min(64, len(paths) // (workers * 4)))
+            records = pool.map(reanalyse_file, paths, [args.notam_rules] * len(paths), chunksize=chunk)
+            for record in records:
+                writer.write(record)
+                stats['files'] += 1
+                stats['pages'] += record['pages']
+                if record['status'] == 'error':
+                    stats['errors'] += 1
+                    print(f"Error reanalysing {record['file']}: {record['error']}", file=sys.stderr)
+                    continue
+                stats[record['status']] += 1
+                if store is not None:
+                    to_store.append((record['summary'], record['file'], record['digest']))
+                    if len(to_store) >= STORE_BATCH:
+                        stats['stored'] += len(store.add_many(to_store))
+                        to_store = []
+        if to_store:
+            stats['stored'] += len(store.add_many(to_store))
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if store is not None:
+            store.close()
+
+    elapsed = time.perf_counter() - start or 1e-9
+    print(
+        f"{stats['files']} layers ({stats['ok']} ok, {stats['partial']} partial, {stats['errors']} errors), "
+        f"{stats['pages']} pages parsed in {elapsed:.2f}s: {stats['files'] / elapsed:.1f} files/s"
+        + (f", {stats['stored']} stored in {args.store}" if store is not None else ""),
+        file=sys.stderr,
+    )
+    return 1 if stats['errors'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
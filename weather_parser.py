@@ -0,0 +1,155 @@
+import re
+from collections import namedtuple
+
+# Airport header, e.g. "YSSY -SYD - SYDNEY K.SMITH."
+AIRPORT_HEADER = re.compile(r'^\s*([A-Z]{4})[ \t]+-[ \t]*(?:[A-Z]{3})?[ \t]*-')
+# Report line, e.g. "SA 020100Z 19023KT 1500 R16L/0800 BKN004 ..."
+REPORT_START = re.compile(r'^\s*(SA|SP|FT|FC|METAR|SPECI|TAF)\s+(?:[A-Z]{4}\s+)?(\d{6})Z\b(.*)$')
+# TAF change groups continue the report on the following lines
+TAF_CONTINUATION = re.compile(r'^\s*(?:BECMG|TEMPO|FM\d{6}|PROB\d{2}|INTER|RMK)\b')
+
+REPORT_KINDS = {
+    'SA': 'METAR', 'METAR': 'METAR',
+    'SP': 'SPECI', 'SPECI': 'SPECI',
+    'FT': 'TAF', 'FC': 'TAF', 'TAF': 'TAF',
+}
+
+WIND = re.compile(r'^(\d{3}|VRB)(\d{2,3})(?:G(\d{2,3}))?(KT|MPS)$')
+VISIBILITY = re.compile(r'^(\d{4})(?:[NSEW]{1,2})?$')
+RVR = re.compile(r'^R(\d{2}[LRC]?)/([PM]?\d{4})(?:V[PM]?\d{4})?(?:FT)?[UDN]?$')
+CLOUD = re.compile(r'^(BKN|OVC|VV)(\d{3})')
+VALIDITY = re.compile(r'^\d{4}/\d{4}$')
+
+WeatherReport = namedtuple('WeatherReport', [
+    'airport', 'kind', 'time', 'valid', 'wind', 'visibility', 'rvr', 'ceiling', 'raw'])
+Wind = namedtuple('Wind', ['direction', 'speed', 'gust', 'unit'])
+
+LOW_VIS_LIMIT = 2000
+# Lines between calls to a WeatherIndex check callable
+CHECK_EVERY = 256
+
+
+def format_wind(wind):
+    # "190/23", "190/23G35" as shown on the arrival wind card
+    if wind is None:
+        return None
+    text = f"{wind.direction}/{wind.speed:02d}"
+    return f"{text}G{wind.gust:02d}" if wind.gust else text
+
+
+def parse_report(airport, kind, time, body):
+    wind = visibility = ceiling = valid = None
+    rvr = []
+    for token in body.split():
+        # Only the prevailing groups before the first TAF change group count
+        if TAF_CONTINUATION.match(token):
+            break
+        if valid is None and kind == 'TAF' and VALIDITY.match(token):
+            valid = token
+            continue
+        if wind is None:
+            m = WIND.match(token)
+            if m:
+                wind = Wind(m.group(1), int(m.group(2)), int(m.group(3)) if m.group(3) else None, m.group(4))
+                continue
+        if visibility is None:
+            if token == 'CAVOK':
+                visibility = 9999
+                continue
+            m = VISIBILITY.match(token)
+            if m:
+                visibility = int(m.group(1))
+                continue
+        m = RVR.match(token)
+        if m:
+            rvr.append({'runway': m.group(1), 'value': m.group(2)})
+            continue
+        m = CLOUD.match(token)
+        if m:
+            height = int(m.group(2)) * 100
+            if ceiling is None or height < ceiling:
+                ceiling = height
+    return WeatherReport(airport, kind, time, valid, wind, visibility, rvr, ceiling, body.strip())
+
+
+class WeatherIndex:
+    # One pass over the weather section: splits it into airport blocks and
+    # parses every METAR/SPECI/TAF into a WeatherReport. check, if given, is
+    # called every CHECK_EVERY lines and may raise to abandon the pass.
+    def __init__(self, text, check=None):
+        self.reports = {}  # icao -> [WeatherReport], airports in header order
+        self._parse(text, check)
+
+    def _parse(self, text, check=None):
+        airport = None
+        pending = None  # (kind, time, [body lines]) of the report being read
+
+        for i, line in enumerate(text.split('\n')):
+            if check is not None and i % CHECK_EVERY == 0:
+                check()
+            header = AIRPORT_HEADER.match(line)
+            if header:
+                self._flush(airport, pending)
+                pending = None
+                airport = header.group(1)
+                self.reports.setdefault(airport, [])
+                continue
+            if airport is None:
+                continue
+            start = REPORT_START.match(line)
+            if start:
+                self._flush(airport, pending)
+                pending = (REPORT_KINDS[start.group(1)], start.group(2), [start.group(3)])
+            elif pending and pending[0] == 'TAF' and TAF_CONTINUATION.match(line):
+                pending[2].append(line.strip())
+            else:
+                self._flush(airport, pending)
+                pending = None
+        self._flush(airport, pending)
+
+    def _flush(self, airport, pending):
+        if airport is None or pending is None:
+            return
+        kind, time, lines = pending
+        self.reports[airport].append(parse_report(airport, kind, time, " ".join(lines)))
+
+    def airports(self):
+        return list(self.reports)
+
+    def first(self, airport, kind):
+        for report in self.reports.get(airport, ()):
+            if report.kind == kind:
+                return report
+        return None
+
+    def metar(self, airport):
+        return self.first(airport, 'METAR')
+
+    def taf(self, airport):
+        return self.first(airport, 'TAF')
+
+    def wind(self, airport):
+        # Observed wind first, forecast wind if there is no METAR
+        for report in (self.metar(airport), self.taf(airport)):
+            if report is not None and report.wind is not None:
+                return report.wind
+        return None
+
+    def visibility_summary(self):
+        # One entry per airport whose METAR reports a visibility
+        summary = []
+        for airport in self.reports:
+            metar = self.metar(airport)
+            if metar is None or metar.visibility is None:
+                continue
+            rvr_values = [int(r['value'].lstrip('PM')) for r in metar.rvr]
+            summary.append({
+                'airport': airport,
+                'visibility': metar.visibility,
+                'low_vis': metar.visibility < LOW_VIS_LIMIT,
+                'time': metar.time,
+                'wind': format_wind(metar.wind),
+                'rvr': min(rvr_values) if rvr_values else None,
+                'ceiling': metar.ceiling,
+            })
+        return summary